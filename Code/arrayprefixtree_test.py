@@ -0,0 +1,145 @@
+#!python3
+
+from arrayprefixtree import ArrayPrefixTree
+from prefixtree import PrefixTree
+import os
+import tempfile
+import unittest
+
+
+class ArrayPrefixTreeTest(unittest.TestCase):
+
+    def test_init_and_properties(self):
+        tree = ArrayPrefixTree()
+        # Verify tree size property
+        assert tree.size == 0
+        assert tree.is_empty() is True
+        # Verify root node is the only node
+        assert tree.num_nodes() == 1
+        assert tree.terminal[0] == 0
+        assert tree.first_child[0] == ArrayPrefixTree.NO_NODE
+
+    def test_size_with_repeated_insert(self):
+        tree = ArrayPrefixTree()
+        tree.insert('ABC')
+        assert tree.size == 1
+        tree.insert('ABC')
+        assert tree.size == 1
+        # Inserting a prefix of a string already in the tree adds no nodes
+        tree.insert('A')
+        assert tree.size == 2
+        assert tree.num_nodes() == 4
+        tree.insert('ABD')
+        assert tree.size == 3
+        assert tree.num_nodes() == 5
+
+    def test_contains(self):
+        tree = ArrayPrefixTree(['ABC', 'ABD', 'A', 'XYZ'])
+        assert tree.contains('ABC') is True
+        assert tree.contains('ABD') is True
+        assert tree.contains('A') is True
+        assert tree.contains('XYZ') is True
+        assert tree.contains('AB') is False
+        assert tree.contains('ABCD') is False
+        assert tree.contains('B') is False
+        assert tree.contains('XY') is False
+        assert tree.contains('') is False
+
+    def test_complete(self):
+        tree = ArrayPrefixTree(['ABC', 'ABD', 'A', 'XYZ'])
+        assert tree.complete('ABC') == ['ABC']
+        assert tree.complete('AB') == ['ABC', 'ABD']
+        assert tree.complete('A') == ['A', 'ABC', 'ABD']
+        assert tree.complete('AX') == []
+        assert tree.complete('B') == []
+        assert tree.complete('X') == ['XYZ']
+        assert tree.complete('') == ['A', 'ABC', 'ABD', 'XYZ']
+
+    def test_matches_prefix_tree(self):
+        strings = ('Shelly sells seashells by the sea shore '
+                   'Peter Piper picked a peck of pickled peppers').split()
+        array_tree = ArrayPrefixTree(reversed(strings))
+        tree = PrefixTree(strings)
+        assert array_tree.size == len(set(strings))
+        # Strings come out in sorted order regardless of insertion order
+        assert array_tree.strings() == sorted(set(strings))
+        for prefix in ['', 'S', 's', 'se', 'sea', 'p', 'pe', 'pi', 'Q']:
+            assert array_tree.complete(prefix) == tree.complete(prefix)
+
+    def test_count(self):
+        strings = ['A', 'ABC', 'ABD', 'XYZ']
+        trees = [ArrayPrefixTree(strings),
+                 ArrayPrefixTree.from_tree(PrefixTree(strings))]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tree.bin')
+            trees[0].save(path)
+            trees.append(ArrayPrefixTree.load(path, mmap=True))
+            for tree in trees:
+                assert tree.count('') == 4
+                assert tree.count('A') == 3
+                assert tree.count('AB') == 2
+                assert tree.count('ABD') == 1
+                assert tree.count('AX') == 0
+                assert tree.count('XYZW') == 0
+            trees[-1].close()
+        # Verify counts are only updated for strings not already in the tree
+        tree = trees[0]
+        tree.insert('AB')
+        tree.insert('ABC')
+        assert tree.count('') == 5
+        assert tree.count('AB') == 3
+        assert tree.count('ABC') == 1
+
+    def test_from_tree(self):
+        tree = PrefixTree(['A', 'XYZ', 'ABD', 'ABC'])
+        array_tree = ArrayPrefixTree.from_tree(tree)
+        assert array_tree.size == tree.size
+        assert array_tree.num_nodes() == 8
+        assert array_tree.strings() == ['A', 'ABC', 'ABD', 'XYZ']
+        assert array_tree.complete('AB') == ['ABC', 'ABD']
+
+    def test_save_and_load(self):
+        strings = ['A', 'ABC', 'ABD', 'XYZ']
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tree.bin')
+            PrefixTree(strings).save(path)
+            for mmap in (True, False):
+                tree = PrefixTree.load(path, mmap=mmap)
+                assert tree.size == 4
+                assert tree.contains('ABD') is True
+                assert tree.contains('AB') is False
+                assert tree.complete('A') == ['A', 'ABC', 'ABD']
+                assert tree.strings() == sorted(strings)
+                if mmap:
+                    # Verify memory-mapped trees are read-only
+                    with self.assertRaises(ValueError):
+                        tree.insert('XY')
+                else:
+                    tree.insert('XY')
+                    assert tree.complete('X') == ['XY', 'XYZ']
+                tree.close()
+
+    def test_load_invalid_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'words.txt')
+            with open(path, 'w') as file:
+                file.write('not a prefix tree file\n')
+            with self.assertRaises(ValueError):
+                ArrayPrefixTree.load(path, mmap=False)
+
+    def test_load_truncated_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tree.bin')
+            ArrayPrefixTree(['A', 'ABC', 'ABD', 'XYZ']).save(path)
+            with open(path, 'rb') as file:
+                data = file.read()
+            # Cut the file off in the middle of the last (terminal) column
+            with open(path, 'wb') as file:
+                file.write(data[:-3])
+            for mmap in (True, False):
+                with self.assertRaises(ValueError):
+                    ArrayPrefixTree.load(path, mmap=mmap)
+
+
+if __name__ == '__main__':
+    unittest.main()
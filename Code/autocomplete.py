@@ -1,16 +1,50 @@
 #!python
 
+import argparse
+import itertools
+import mmap
+import multiprocessing
+import os
 import sys
 import time
 
 
+# Names of the algorithms that autocomplete can be set up with
+ALGORITHMS = ('linear_search', 'trie', 'sorted_bisect', 'suffix_array')
+# Names of the algorithms that can also find words containing a fragment
+INFIX_ALGORITHMS = ('linear_search', 'suffix_array')
+# Longest prefix whose range sorted_bisect looks up in a precomputed table
+PREFIX_TABLE_LENGTH = 3
+
+
 def get_lines(filename='/usr/share/dict/words'):
     """Return a list of strings on separate lines in the given text file with
     any leading and trailing whitespace characters removed from each line."""
-    # Open file and remove whitespace from each line
-    with open(filename) as file:
-        lines = [line.strip() for line in file]
-    return lines
+    return list(iter_lines(filename))
+
+
+def iter_lines(filename='/usr/share/dict/words', encoding='utf-8',
+               errors='strict', unique=False):
+    """Generate strings on separate lines in the given text file with any
+    leading and trailing whitespace characters removed from each line.
+    The file is memory-mapped and decoded one line at a time with the given
+    encoding, which must encode newlines as single b'\\n' bytes (as UTF-8
+    and Latin-1 do), so the whole list of lines is never held in memory.
+    If unique is True, skip lines that were already generated, which holds
+    only the set of distinct lines in memory."""
+    seen = set() if unique else None
+    with open(filename, 'rb') as file:
+        # Empty files can't be memory-mapped and have no lines anyway
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for line in iter(data.readline, b''):
+                string = line.decode(encoding, errors).strip()
+                if seen is not None:
+                    if string in seen:
+                        continue
+                    seen.add(string)
+                yield string
 
 
 def generate_prefixes(vocabulary):
@@ -21,14 +55,69 @@ def generate_prefixes(vocabulary):
 
 def autocomplete_setup(vocabulary, algorithm='linear_search'):
     """Return the main data structure needed to set up autocomplete using the
-    given vocabulary and algorithm, specified as linear_search, trie, etc."""
+    given vocabulary and algorithm, specified as linear_search, trie, etc.
+    The vocabulary may be any iterable, such as a generator from iter_lines,
+    which the trie and sorted_bisect backends build from as it streams."""
     if algorithm == 'linear_search':
-        # Use the given vocabulary list
-        return vocabulary
+        # Use the given vocabulary list, or collect the streamed vocabulary
+        return vocabulary if isinstance(vocabulary, list) else list(vocabulary)
     elif algorithm == 'trie':
-        from trie import Trie
-        # Create a trie structure with the vocabulary
-        return Trie(vocabulary)
+        from prefixtree import PrefixTree
+        # Create a prefix tree with the vocabulary, reusing shared prefixes
+        # of consecutive words, which is fastest when they are sorted
+        return PrefixTree.from_sorted(vocabulary)
+    elif algorithm == 'sorted_bisect':
+        from sortedwordlist import SortedWordList
+        # Sort the vocabulary once so each prefix's words are in one range,
+        # and look up the ranges of the most common, shortest prefixes
+        return SortedWordList(vocabulary, PREFIX_TABLE_LENGTH)
+    elif algorithm == 'suffix_array':
+        from suffixarray import SuffixArray
+        # Index every substring of the vocabulary, not just its prefixes
+        return SuffixArray(vocabulary)
+    raise ValueError(f'Unknown autocomplete algorithm {algorithm!r}')
+
+
+def autocomplete_setup_cached(filename, algorithm='linear_search',
+                              directory=None):
+    """Return a pair of the data structure set up with the vocabulary in the
+    given file and the given algorithm, and True if it was loaded from the
+    index cache in the given directory (by default ~/.cache/autocomplete)
+    instead of being set up again because the file hasn't changed since."""
+    from indexcache import IndexCache
+    cache = IndexCache(directory)
+    return cache.get_or_build(
+        filename, algorithm,
+        lambda filename: autocomplete_setup(iter_lines(filename), algorithm))
+
+
+def autocomplete_setup_iter(vocabulary, algorithm='linear_search',
+                            chunk_size=10000):
+    """Generate the data structure set up with the given vocabulary and
+    algorithm after each chunk of `chunk_size` strings is added to it, so
+    queries can be answered with the words loaded so far while the rest of a
+    streamed vocabulary is still loading. The same structure is generated
+    each time, growing in place, except for suffix_array, which is generated
+    once the whole vocabulary is loaded."""
+    if algorithm == 'suffix_array':
+        # A suffix array can't grow in place, so build it once from the
+        # whole vocabulary
+        yield autocomplete_setup(vocabulary, algorithm)
+        return
+    vocabulary = iter(vocabulary)
+    structure = None
+    while True:
+        chunk = list(itertools.islice(vocabulary, chunk_size))
+        if structure is None:
+            structure = autocomplete_setup(chunk, algorithm)
+        elif len(chunk) > 0:
+            # Lists, prefix trees and sorted word lists all have extend
+            structure.extend(chunk)
+        else:
+            break
+        yield structure
+        if len(chunk) < chunk_size:
+            break
 
 
 def autocomplete(prefix, structure, algorithm='linear_search'):
@@ -37,75 +126,282 @@ def autocomplete(prefix, structure, algorithm='linear_search'):
     if algorithm == 'linear_search':
         # Search the list using linear search
         return [word for word in structure if word.startswith(prefix)]
-    elif algorithm == 'trie':
-        # Search the trie structure for the prefix
-        return structure.search(prefix)
+    elif algorithm in ('trie', 'sorted_bisect', 'suffix_array'):
+        # Search the prefix tree or binary search the sorted list or suffixes
+        return structure.complete(prefix)
+    raise ValueError(f'Unknown autocomplete algorithm {algorithm!r}')
+
+
+def autocomplete_batch(prefixes, structure, algorithm='linear_search'):
+    """Return a list of the lists of vocabulary entries that start with each
+    of the given prefixes, in the same order as the prefixes, using the given
+    structure and algorithm. Prefixes are resolved together in sorted order,
+    so work done for a prefix is reused for longer prefixes that extend it."""
+    if algorithm == 'linear_search':
+        from prefixbatch import complete_batch
+
+        def search(words, prefix):
+            return [word for word in words if word.startswith(prefix)]
+        # Search the list for each prefix that extends no other, and only
+        # the completions of the longest shorter prefix for the rest, which
+        # are in vocabulary order, so they're searched instead of sliced
+        return complete_batch(prefixes,
+                              lambda prefix: search(structure, prefix),
+                              search)
+    elif algorithm in ('trie', 'sorted_bisect', 'suffix_array'):
+        # Walk down from parent nodes or search within parent ranges
+        return structure.complete_batch(prefixes)
+    raise ValueError(f'Unknown autocomplete algorithm {algorithm!r}')
+
+
+def autocomplete_infix(fragment, structure, algorithm='linear_search'):
+    """Return all distinct vocabulary entries that contain the given fragment
+    anywhere, not just at the start, in sorted order, using the given
+    structure and algorithm, specified as linear_search or suffix_array."""
+    if algorithm == 'linear_search':
+        # Search the list using linear search, listing each distinct word
+        # once in sorted order as the suffix array does
+        return sorted(set(word for word in structure if fragment in word))
+    elif algorithm == 'suffix_array':
+        # Binary search the sorted suffixes that start with the fragment
+        return structure.search(fragment)
+    raise ValueError(f'Algorithm {algorithm!r} cannot search for fragments')
+
+
+def autocomplete_count(prefix, structure, algorithm='linear_search'):
+    """Return the number of vocabulary entries that start with the given prefix
+    using the given structure and algorithm, without listing them if the
+    structure can count them directly."""
+    if algorithm == 'linear_search':
+        return sum(1 for word in structure if word.startswith(prefix))
+    elif algorithm in ('trie', 'sorted_bisect', 'suffix_array'):
+        # Read the prefix node's subtree count or the size of the range
+        return structure.count(prefix)
+    raise ValueError(f'Unknown autocomplete algorithm {algorithm!r}')
+
+
+# Structure and algorithm that each worker process of a pool answers
+# queries with, set once per worker by _init_worker
+_worker_structure = None
+_worker_algorithm = None
+
+
+def _init_worker(structure, algorithm):
+    """Store the given structure and algorithm for this worker process."""
+    global _worker_structure, _worker_algorithm
+    _worker_structure = structure
+    _worker_algorithm = algorithm
+
+
+def _complete_chunk(prefixes):
+    """Return the completions of each of the given prefixes in this worker."""
+    return autocomplete_batch(prefixes, _worker_structure, _worker_algorithm)
+
+
+def _count_chunk(prefixes):
+    """Return the number of completions of each of the given prefixes in this
+    worker."""
+    return [autocomplete_count(prefix, _worker_structure, _worker_algorithm)
+            for prefix in prefixes]
+
+
+def _map_chunks(function, prefixes, structure, algorithm, workers):
+    """Return the results of calling the given function on chunks of the
+    given prefixes in a pool of worker processes, merged in input order.
+    The structure is handed to each worker once when the pool starts: forked
+    workers inherit it without pickling, and other start methods pickle it
+    once per worker instead of once per chunk."""
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers < 1:
+        raise ValueError(f'workers must be at least 1: {workers}')
+    if len(prefixes) == 0:
+        return []
+    # Split prefixes into a few chunks per worker to balance uneven chunks
+    num_chunks = max(1, min(len(prefixes), workers * 4))
+    chunk_size = -(-len(prefixes) // num_chunks)  # Round up
+    chunks = [prefixes[i:i + chunk_size]
+              for i in range(0, len(prefixes), chunk_size)]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods
+                                          else None)
+    with context.Pool(workers, initializer=_init_worker,
+                      initargs=(structure, algorithm)) as pool:
+        results = []
+        for chunk_results in pool.map(function, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+def autocomplete_parallel(prefixes, structure, algorithm='linear_search',
+                          workers=None):
+    """Return a list of the lists of vocabulary entries that start with each
+    of the given prefixes, in the same order as the prefixes, answering chunks
+    of prefixes in parallel with the given number of worker processes (by
+    default, one per CPU). Workers only pay off with more than one CPU; on
+    one CPU this is slower than autocomplete_batch, as each extra worker
+    only adds pool overhead."""
+    return _map_chunks(_complete_chunk, list(prefixes), structure, algorithm,
+                       workers)
+
+
+def autocomplete_count_parallel(prefixes, structure,
+                                algorithm='linear_search', workers=None):
+    """Return a list of the number of vocabulary entries that start with each
+    of the given prefixes, in the same order as the prefixes, counting chunks
+    of prefixes in parallel with the given number of worker processes (by
+    default, one per CPU)."""
+    return _map_chunks(_count_chunk, list(prefixes), structure, algorithm,
+                       workers)
+
+
+def parse_args(args):
+    """Return the command-line options parsed from the given arguments."""
+    parser = argparse.ArgumentParser(
+        description='Test autocomplete with dictionary words and a prefix, or '
+                    'with the given prefixes and vocabulary files')
+    parser.add_argument('files', nargs='+', metavar='prefix',
+                        help='prefix, or prefixes-file vocabulary-file')
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS,
+                        help='data structure and search algorithm to use '
+                             '(default: linear_search, or all to benchmark)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='with prefixes and vocabulary files, time setup '
+                             'and each query over repeated runs and print '
+                             'JSON results')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timed benchmark runs (default: 5)')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='with prefixes and vocabulary files, answer '
+                             'prefixes with N worker processes')
+    parser.add_argument('--cache', action='store_true',
+                        help='load the structure set up by an earlier run '
+                             'from the index cache if the vocabulary file is '
+                             'unchanged, or else set it up and store it')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help='index cache directory, which implies --cache '
+                             '(default: ~/.cache/autocomplete)')
+    options = parser.parse_args(args)
+    if len(options.files) > 2:
+        parser.error('expected a prefix, or prefixes-file vocabulary-file')
+    if options.benchmark and len(options.files) != 2:
+        parser.error('--benchmark requires prefixes-file vocabulary-file')
+    if options.workers is not None and options.workers < 1:
+        parser.error(f'--workers must be at least 1, not {options.workers}')
+    if options.cache_dir is not None:
+        options.cache = True
+    return options
+
+
+def setup_from_file(filename, algorithm, cache=False, cache_directory=None):
+    """Return a tuple of the data structure set up with the vocabulary in the
+    given file and the given algorithm, the number of strings in it and
+    whether it was loaded from the index cache, using the index cache in the
+    given directory (by default ~/.cache/autocomplete) only if cache is True.
+    Without the cache, the file's lines are streamed into the structure, so
+    they aren't held in a list while it's being set up.
+    """
+    if not cache:
+        structure = autocomplete_setup(iter_lines(filename), algorithm)
+        cached = False
+    else:
+        structure, cached = autocomplete_setup_cached(filename, algorithm,
+                                                      cache_directory)
+    size = len(structure) if isinstance(structure, list) else structure.size
+    return structure, size, cached
 
 
 def main():
     """Read command-line arguments and test autocomplete algorithms."""
     if len(sys.argv) == 1:
         script = sys.argv[0]  # Get script file name
-        print('Usage: {} prefix'.format(script))
+        print('Usage: {} [-a algorithm] prefix'.format(script))
         print('Test autocomplete with dictionary words and the given prefix')
         print('Example: {} axl'.format(script))
         print('Completions of axl: axle, axled, axlesmith, axletree')
         print()
-        print('Usage: {} prefixes-file vocabulary-file'.format(script))
+        print('Usage: {} [-a algorithm] [--benchmark] [--workers N] '
+              '[--cache] prefixes-file vocabulary-file'.format(script))
         print('Test autocomplete with the given prefixes and vocabulary files')
         print('Example: {} prefixes.txt /usr/share/dict/words'.format(script))
+        print()
+        print('Algorithms: {}'.format(', '.join(ALGORITHMS)))
+        return
+
+    options = parse_args(sys.argv[1:])
+    algorithm = options.algorithm or 'linear_search'
+
+    if options.benchmark:
+        from autocomplete_benchmark import benchmark
+        import json
+        # Benchmark the given algorithm, or all of them if none was given
+        algorithms = [options.algorithm] if options.algorithm else ALGORITHMS
+        vocabulary = get_lines(options.files[1])
+        prefixes = get_lines(options.files[0])
+        results = benchmark(vocabulary, prefixes, algorithms, options.repeat,
+                            max_workers=options.workers)
+        print(json.dumps(results, indent=2))
         return
 
-    elif len(sys.argv) == 2:
+    if len(options.files) == 1:
         # Test autocomplete with dictionary words and the given prefix
-        prefix = sys.argv[1]
-        vocabulary = get_lines('/usr/share/dict/words')
+        prefix = options.files[0]
 
         # Start the clock for benchmarking
         start_time = time.time()
 
-        # Set up autocomplete and mark the clock
-        structure = autocomplete_setup(vocabulary)
+        # Set up autocomplete, or load it from the cache, and mark the clock
+        structure, vocabulary_size, cached = setup_from_file(
+            '/usr/share/dict/words', algorithm, options.cache,
+            options.cache_dir)
         setup_time = time.time()
 
         # Run autocomplete and mark the clock
-        completions = autocomplete(prefix, structure)
+        completions = autocomplete(prefix, structure, algorithm)
         end_time = time.time()
 
-        print('Vocabulary size: {}'.format(len(vocabulary)))
+        print('Algorithm: {}'.format(algorithm))
+        print('Vocabulary size: {}'.format(vocabulary_size))
         print('Completions of {}: {}'.format(prefix, ', '.join(completions)))
         print()
-        print('Initial setup time: {:.6f} sec'.format(setup_time - start_time))
+        print('Initial setup time: {:.6f} sec{}'.format(
+            setup_time - start_time, ' (from cache)' if cached else ''))
         print('Autocomplete time:  {:.6f} sec'.format(end_time - setup_time))
         print('Total time elapsed: {:.6f} sec'.format(end_time - start_time))
 
-    elif len(sys.argv) == 3:
-        # Open the given vocabulary and prefixes files
-        vocabulary = get_lines(sys.argv[2])
-        prefixes = get_lines(sys.argv[1])
+    else:
+        # Open the given prefixes file
+        prefixes = get_lines(options.files[0])
 
         # Start the clock for benchmarking
         start_time = time.time()
 
-        # Set up autocomplete and mark the clock
-        structure = autocomplete_setup(vocabulary)
+        # Set up autocomplete, or load it from the cache, and mark the clock
+        structure, vocabulary_size, cached = setup_from_file(
+            options.files[1], algorithm, options.cache, options.cache_dir)
         setup_time = time.time()
 
-        # Run autocomplete with each prefix
+        # Count completions of each prefix, which the trie and sorted list
+        # backends can do without listing every completion
         num_completions = 0
-        for prefix in prefixes:
-            completions = autocomplete(prefix, structure)
-            num_completions += len(completions)
-            # print('Completions of {}: {}'.format(prefix, ', '.join(completions)))
+        if options.workers is not None:
+            num_completions = sum(autocomplete_count_parallel(
+                prefixes, structure, algorithm, options.workers))
+        else:
+            for prefix in prefixes:
+                num_completions += autocomplete_count(prefix, structure,
+                                                      algorithm)
 
         # Mark the clock
         end_time = time.time()
 
-        print('Vocabulary size: {}'.format(len(vocabulary)))
+        print('Algorithm: {}'.format(algorithm))
+        print('Vocabulary size: {}'.format(vocabulary_size))
         print('Found {} total completions of {} prefixes'
               .format(num_completions, len(prefixes)))
         print()
-        print('Initial setup time: {:.6f} sec'.format(setup_time - start_time))
+        print('Initial setup time: {:.6f} sec{}'.format(
+            setup_time - start_time, ' (from cache)' if cached else ''))
         print('Autocomplete time:  {:.6f} sec'.format(end_time - setup_time))
         print('Total time elapsed: {:.6f} sec'.format(end_time - start_time))
 
@@ -0,0 +1,212 @@
+#!python3
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+import tracemalloc
+
+from autocomplete import ALGORITHMS, INFIX_ALGORITHMS, autocomplete_setup, \
+    autocomplete, autocomplete_batch, autocomplete_infix, \
+    autocomplete_parallel, get_lines
+from workload import random_words, zipf_prefixes
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at the given fraction (such as 0.95) of the given list
+    of values in sorted order, using the nearest-rank method."""
+    if len(sorted_values) == 0:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure_setup(vocabulary, algorithm, repeat):
+    """Return a dict of the best and median time in seconds to set up the given
+    algorithm with the given vocabulary over the given number of runs."""
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        autocomplete_setup(vocabulary, algorithm)
+        timings.append(time.perf_counter() - start_time)
+    return {'best': min(timings), 'median': statistics.median(timings)}
+
+
+def measure_memory(vocabulary, algorithm):
+    """Return a dict of the peak bytes allocated while setting up the given
+    algorithm with the given vocabulary and the bytes still held after."""
+    tracemalloc.start()
+    structure = autocomplete_setup(vocabulary, algorithm)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return {'peak_bytes': peak, 'structure_bytes': current}
+
+
+def measure_queries(structure, algorithm, prefixes, repeat, warmup,
+                    query=autocomplete):
+    """Return a dict of per-query latency statistics in seconds over the given
+    number of timed runs through the given prefixes, after the given number of
+    untimed warmup runs, answering each with the given query function."""
+    for _ in range(warmup):
+        for prefix in prefixes:
+            query(prefix, structure, algorithm)
+    latencies = []
+    run_times = []
+    for _ in range(repeat):
+        run_start = time.perf_counter()
+        for prefix in prefixes:
+            start_time = time.perf_counter()
+            query(prefix, structure, algorithm)
+            latencies.append(time.perf_counter() - start_time)
+        run_times.append(time.perf_counter() - run_start)
+    latencies.sort()
+    return {
+        'mean': statistics.fmean(latencies) if latencies else None,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None,
+        'queries_per_sec': (len(prefixes) / min(run_times)
+                            if min(run_times) > 0 else None),
+    }
+
+
+def measure_batch(structure, algorithm, prefixes, repeat):
+    """Return the best time in seconds to complete all the given prefixes
+    together with autocomplete_batch over the given number of runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        autocomplete_batch(prefixes, structure, algorithm)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def measure_parallel(structure, algorithm, prefixes, repeat, max_workers):
+    """Return a dict mapping each number of workers from 1 to `max_workers` to
+    the best time in seconds (including starting the pool) to complete all
+    the given prefixes with autocomplete_parallel, and the speedup over one
+    worker."""
+    scaling = {}
+    for workers in range(1, max_workers + 1):
+        best = float('inf')
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            autocomplete_parallel(prefixes, structure, algorithm, workers)
+            best = min(best, time.perf_counter() - start_time)
+        scaling[workers] = {'sec': best, 'speedup': scaling[1]['sec'] / best
+                            if workers > 1 else 1.0}
+    return scaling
+
+
+def benchmark(vocabulary, prefixes, algorithms=ALGORITHMS, repeat=5,
+              warmup=1, max_workers=None):
+    """Return a dict of setup time, peak memory, per-query latency and batch
+    time of each of the given algorithms on the given vocabulary and prefixes,
+    which can be written out as JSON. Algorithms that can search for words
+    containing a fragment are also timed using the prefixes as fragments.
+    If `max_workers` is given, also time parallel completion with each number
+    of workers up to it."""
+    results = {}
+    for algorithm in algorithms:
+        structure = autocomplete_setup(vocabulary, algorithm)
+        results[algorithm] = {
+            'setup_sec': measure_setup(vocabulary, algorithm, repeat),
+            'memory': measure_memory(vocabulary, algorithm),
+            'query_sec': measure_queries(structure, algorithm, prefixes,
+                                         repeat, warmup),
+            'batch_sec': measure_batch(structure, algorithm, prefixes, repeat),
+        }
+        if algorithm in INFIX_ALGORITHMS:
+            results[algorithm]['infix_query_sec'] = measure_queries(
+                structure, algorithm, prefixes, repeat, warmup,
+                autocomplete_infix)
+        if max_workers is not None:
+            results[algorithm]['parallel'] = measure_parallel(
+                structure, algorithm, prefixes, repeat, max_workers)
+        del structure
+    return {
+        'vocabulary_size': len(vocabulary),
+        'num_prefixes': len(prefixes),
+        'repeat': repeat,
+        'warmup': warmup,
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+
+def parse_args(args):
+    """Return the command-line options parsed from the given arguments."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark autocomplete algorithms and print JSON results')
+    parser.add_argument('--vocabulary', metavar='FILE',
+                        help='vocabulary file (default: random words)')
+    parser.add_argument('--prefixes', metavar='FILE',
+                        help='prefixes file (default: Zipf-distributed '
+                             'prefixes of the vocabulary)')
+    parser.add_argument('--words', type=int, default=10000,
+                        help='number of random words to generate when no '
+                             'vocabulary file is given (default: 10000)')
+    parser.add_argument('--queries', type=int, default=1000,
+                        help='number of prefixes to generate when no prefixes '
+                             'file is given (default: 1000)')
+    parser.add_argument('--zipf', type=float, default=1.1, metavar='EXPONENT',
+                        help='Zipf exponent of generated prefixes '
+                             '(default: 1.1)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for generated workloads (default: 0)')
+    parser.add_argument('-a', '--algorithm', dest='algorithms',
+                        action='append', choices=ALGORITHMS,
+                        help='algorithm to benchmark, may be repeated '
+                             '(default: all)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timed runs (default: 5)')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='number of untimed warmup runs (default: 1)')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='also time parallel completion with 1 to N '
+                             'worker processes')
+    parser.add_argument('--scaling', type=int, nargs='+', metavar='WORDS',
+                        help='benchmark generated vocabularies of each of the '
+                             'given sizes, such as 10000 100000 1000000')
+    options = parser.parse_args(args)
+    if options.workers is not None and options.workers < 1:
+        parser.error(f'--workers must be at least 1, not {options.workers}')
+    return options
+
+
+def main():
+    """Read command-line arguments, run benchmarks and print JSON results."""
+    options = parse_args(sys.argv[1:])
+    algorithms = options.algorithms or ALGORITHMS
+    if options.scaling:
+        # Benchmark each vocabulary size with prefixes generated from it
+        runs = []
+        for num_words in options.scaling:
+            vocabulary = random_words(num_words, seed=options.seed)
+            prefixes = zipf_prefixes(vocabulary, options.queries,
+                                     exponent=options.zipf, seed=options.seed)
+            runs.append(benchmark(vocabulary, prefixes, algorithms,
+                                  options.repeat, options.warmup,
+                                  options.workers))
+        print(json.dumps(runs, indent=2))
+        return
+    if options.vocabulary:
+        vocabulary = get_lines(options.vocabulary)
+    else:
+        vocabulary = random_words(options.words, seed=options.seed)
+    if options.prefixes:
+        prefixes = get_lines(options.prefixes)
+    else:
+        prefixes = zipf_prefixes(vocabulary, options.queries,
+                                 exponent=options.zipf, seed=options.seed)
+    print(json.dumps(benchmark(vocabulary, prefixes, algorithms,
+                               options.repeat, options.warmup,
+                               options.workers), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+#!python3
+
+from autocomplete_benchmark import percentile
+import unittest
+
+
+class AutocompleteBenchmarkTest(unittest.TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+        assert percentile([7], 0.99) == 7
+        assert percentile([], 0.5) is None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,343 @@
+#!python3
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from autocomplete import ALGORITHMS, autocomplete_setup, \
+    autocomplete_setup_iter, autocomplete_batch, get_lines, iter_lines
+from autocomplete_benchmark import percentile
+
+
+class AutocompleteServer:
+    """AutocompleteServer: An asyncio server that answers autocomplete
+    requests from one structure set up once at startup. Clients send one JSON
+    object per line, either {"prefix": "ax"} to get its completions or
+    {"stats": true} to get the server's counters, and get one JSON object per
+    line back in the same order. Requests for a prefix that is already being
+    looked up wait for that lookup instead of starting another (coalescing),
+    and requests that arrive within a short window are looked up together
+    with autocomplete_batch (micro-batching).
+    """
+
+    # Upper bounds in seconds of the buckets of the latency histogram
+    LATENCY_BUCKETS = tuple(10 ** exponent * factor
+                            for exponent in range(-6, 1)
+                            for factor in (1, 2, 5))
+
+    def __init__(self, structure, algorithm='linear_search',
+                 batch_window=0.001, max_batch=256):
+        """Initialize this server to answer requests with the given structure
+        and algorithm, waiting up to `batch_window` seconds to collect up to
+        `max_batch` prefixes into each batch."""
+        self.structure = structure
+        self.algorithm = algorithm
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        # Futures of prefixes being looked up, by prefix
+        self.in_flight = {}
+        # Prefixes waiting for the next batch, and the timer that flushes it
+        self.pending = []
+        self.flush_handle = None
+        self.server = None
+        # Counters reported by stats
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_prefixes = 0
+        self.max_queue_depth = 0
+        self.latency_counts = [0] * (len(AutocompleteServer.LATENCY_BUCKETS)
+                                     + 1)
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """Start listening on the given Unix socket path, if given, or else on
+        the given TCP host and port (0 to pick a free port), and return the
+        asyncio server."""
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client,
+                                                          path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client,
+                                                     host, port)
+        return self.server
+
+    def address(self):
+        """Return the address this server is listening on."""
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """Stop listening and wait for the server to close."""
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        """Read requests from a client and write responses in request order,
+        without waiting for one response before reading the next request."""
+        responses = asyncio.Queue()
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start_time = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if isinstance(request, dict) and 'prefix' in request:
+                    prefix = str(request['prefix'])
+                    lookup = asyncio.ensure_future(self.lookup(prefix))
+                    await responses.put((prefix, lookup, start_time))
+                elif isinstance(request, dict) and request.get('stats'):
+                    await responses.put((None, self.stats(), start_time))
+                else:
+                    error = {'error': 'expected {"prefix": ...} or '
+                                      '{"stats": true}'}
+                    await responses.put((None, error, start_time))
+            await responses.put(None)
+            await sender
+        except (asyncio.CancelledError, ConnectionError):
+            # The server is closing or the client went away
+            sender.cancel()
+        finally:
+            writer.close()
+
+    async def _send_responses(self, responses, writer):
+        """Write each response in the given queue as it completes, in order,
+        until a None marks the end of the client's requests."""
+        while True:
+            item = await responses.get()
+            if item is None:
+                break
+            prefix, result, start_time = item
+            if prefix is not None:
+                response = {'prefix': prefix, 'completions': await result}
+                self._record_latency(time.perf_counter() - start_time)
+            else:
+                response = result
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+    async def lookup(self, prefix):
+        """Return the completions of the given prefix, joining a lookup of
+        the same prefix already in flight or else adding it to the next
+        batch."""
+        self.requests += 1
+        future = self.in_flight.get(prefix, None)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[prefix] = future
+        self.pending.append(prefix)
+        self.max_queue_depth = max(self.max_queue_depth, len(self.pending))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        """Look up all pending prefixes in one batch and resolve their
+        futures."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        prefixes = self.pending
+        self.pending = []
+        if len(prefixes) == 0:
+            return
+        self.batches += 1
+        self.batched_prefixes += len(prefixes)
+        try:
+            results = autocomplete_batch(prefixes, self.structure,
+                                         self.algorithm)
+        except Exception as error:
+            for prefix in prefixes:
+                self.in_flight.pop(prefix).set_exception(error)
+            return
+        for prefix, completions in zip(prefixes, results):
+            self.in_flight.pop(prefix).set_result(completions)
+
+    def _record_latency(self, seconds):
+        """Count the given request latency in its histogram bucket."""
+        for index, bound in enumerate(AutocompleteServer.LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.latency_counts[index] += 1
+                return
+        self.latency_counts[-1] += 1
+
+    def stats(self):
+        """Return a dict of this server's counters, current and maximum queue
+        depth and latency histogram, keyed by each bucket's upper bound."""
+        histogram = {f'<={bound:g}s': count for bound, count in
+                     zip(AutocompleteServer.LATENCY_BUCKETS,
+                         self.latency_counts)}
+        histogram[f'>{AutocompleteServer.LATENCY_BUCKETS[-1]:g}s'] = \
+            self.latency_counts[-1]
+        return {
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'mean_batch_size': (self.batched_prefixes / self.batches
+                                if self.batches else 0),
+            'queue_depth': len(self.pending),
+            'in_flight': len(self.in_flight),
+            'max_queue_depth': self.max_queue_depth,
+            'latency_histogram': histogram,
+        }
+
+
+async def open_connection(host='127.0.0.1', port=None, path=None):
+    """Return a (reader, writer) pair connected to an autocomplete server on
+    the given Unix socket path, if given, or else the given host and port."""
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+async def request(reader, writer, message):
+    """Send the given message to a server and return its response."""
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def load_test(prefixes, host='127.0.0.1', port=None, path=None,
+                    concurrency=32, num_requests=None):
+    """Send `num_requests` requests (default: one per prefix) cycling through
+    the given prefixes over `concurrency` connections, each waiting for one
+    response before sending its next request, and return a dict of client
+    side latency percentiles in seconds, throughput and the server's stats."""
+    if num_requests is None:
+        num_requests = len(prefixes)
+    latencies = []
+
+    async def client(index):
+        reader, writer = await open_connection(host, port, path)
+        for number in range(index, num_requests, concurrency):
+            start_time = time.perf_counter()
+            await request(reader, writer,
+                          {'prefix': prefixes[number % len(prefixes)]})
+            latencies.append(time.perf_counter() - start_time)
+        writer.close()
+        await writer.wait_closed()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start_time
+    reader, writer = await open_connection(host, port, path)
+    server_stats = await request(reader, writer, {'stats': True})
+    writer.close()
+    await writer.wait_closed()
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'requests_per_sec': len(latencies) / elapsed if elapsed > 0 else None,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'server': server_stats,
+    }
+
+
+async def serve(options):
+    """Stream the vocabulary into the structure, answering requests with the
+    words loaded so far from the first chunk on, and serve requests until
+    interrupted."""
+    vocabulary = iter_lines(options.vocabulary, unique=True)
+    server = None
+    for structure in autocomplete_setup_iter(vocabulary, options.algorithm):
+        if server is None:
+            server = AutocompleteServer(structure, options.algorithm,
+                                        options.batch_window,
+                                        options.max_batch)
+            await server.start(options.host, options.port, options.unix)
+            print(f'Serving with {options.algorithm} on {server.address()}',
+                  flush=True)
+        # Let requests be answered between chunks
+        await asyncio.sleep(0)
+    print('Loaded the whole vocabulary', flush=True)
+    async with server.server:
+        await server.server.serve_forever()
+
+
+async def demo(options):
+    """Start a server and run the load generator against it in this
+    process."""
+    vocabulary = get_lines(options.vocabulary)
+    prefixes = get_lines(options.prefixes)
+    structure = autocomplete_setup(vocabulary, options.algorithm)
+    server = AutocompleteServer(structure, options.algorithm,
+                                options.batch_window, options.max_batch)
+    await server.start(options.host, 0, options.unix)
+    port = None if options.unix else server.address()[1]
+    results = await load_test(prefixes, options.host, port, options.unix,
+                              options.concurrency, options.requests)
+    await server.close()
+    return results
+
+
+def parse_args(args):
+    """Return the command-line options parsed from the given arguments."""
+    parser = argparse.ArgumentParser(
+        description='Serve autocomplete requests or generate load against a '
+                    'server on this machine')
+    parser.add_argument('mode', choices=('serve', 'load', 'demo'),
+                        help='serve requests, send load to a running server, '
+                             'or do both in one process')
+    parser.add_argument('--vocabulary', metavar='FILE',
+                        default='/usr/share/dict/words',
+                        help='vocabulary file to serve')
+    parser.add_argument('--prefixes', metavar='FILE',
+                        help='prefixes file to send as load')
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS,
+                        default='trie', help='algorithm (default: trie)')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='TCP host (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='TCP port (default: 8765)')
+    parser.add_argument('--unix', metavar='PATH',
+                        help='Unix socket path to use instead of TCP')
+    parser.add_argument('--batch-window', type=float, default=0.001,
+                        metavar='SEC', help='seconds to collect a batch '
+                                            '(default: 0.001)')
+    parser.add_argument('--max-batch', type=int, default=256,
+                        help='most prefixes per batch (default: 256)')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='number of load connections (default: 32)')
+    parser.add_argument('--requests', type=int,
+                        help='number of load requests (default: one per '
+                             'prefix)')
+    options = parser.parse_args(args)
+    if options.mode in ('load', 'demo') and options.prefixes is None:
+        parser.error(f'{options.mode} requires --prefixes')
+    return options
+
+
+def main():
+    """Read command-line arguments and serve or generate load."""
+    options = parse_args(sys.argv[1:])
+    try:
+        if options.mode == 'serve':
+            asyncio.run(serve(options))
+            return
+        if options.mode == 'load':
+            prefixes = get_lines(options.prefixes)
+            results = asyncio.run(load_test(
+                prefixes, options.host, options.port, options.unix,
+                options.concurrency, options.requests))
+        else:
+            results = asyncio.run(demo(options))
+    except KeyboardInterrupt:
+        return
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
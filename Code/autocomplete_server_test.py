@@ -0,0 +1,79 @@
+#!python3
+
+from autocomplete import autocomplete_setup, autocomplete
+from autocomplete_server import AutocompleteServer, open_connection, \
+    request, load_test
+import asyncio
+import unittest
+
+
+VOCABULARY = ['axle', 'axled', 'axlesmith', 'axletree', 'axe', 'ax',
+              'banana', 'band', 'bandana', 'can', 'cane']
+PREFIXES = ['', 'a', 'ax', 'axl', 'axle', 'b', 'ban', 'c', 'cat', 'z']
+
+
+class AutocompleteServerTest(unittest.TestCase):
+
+    def run_with_server(self, test, algorithm='trie', **kwargs):
+        """Run the given coroutine function with a server listening on a free
+        localhost port, closing the server afterward."""
+        async def run():
+            structure = autocomplete_setup(VOCABULARY, algorithm)
+            server = AutocompleteServer(structure, algorithm, **kwargs)
+            await server.start('127.0.0.1', 0)
+            try:
+                await test(server, server.address()[1])
+            finally:
+                await server.close()
+        asyncio.run(run())
+
+    def test_responses_match_autocomplete(self):
+        async def test(server, port):
+            reader, writer = await open_connection(port=port)
+            for prefix in PREFIXES:
+                response = await request(reader, writer, {'prefix': prefix})
+                assert response['prefix'] == prefix
+                assert response['completions'] == autocomplete(
+                    prefix, server.structure, server.algorithm)
+            response = await request(reader, writer, {'word': 'ax'})
+            assert 'error' in response
+            writer.close()
+            await writer.wait_closed()
+        self.run_with_server(test)
+
+    def test_pipelined_requests_are_coalesced_and_batched(self):
+        async def test(server, port):
+            reader, writer = await open_connection(port=port)
+            # Send every request before reading any response
+            prefixes = PREFIXES * 3
+            for prefix in prefixes:
+                writer.write(b'{"prefix": "%s"}\n' % prefix.encode())
+            await writer.drain()
+            # Verify responses come back in request order
+            for prefix in prefixes:
+                line = await reader.readline()
+                assert line.startswith(b'{"prefix": "%s"' % prefix.encode())
+            stats = await request(reader, writer, {'stats': True})
+            assert stats['requests'] == len(prefixes)
+            assert stats['coalesced'] == len(prefixes) - len(PREFIXES)
+            assert stats['batches'] < len(PREFIXES)
+            assert stats['queue_depth'] == 0
+            assert stats['in_flight'] == 0
+            assert sum(stats['latency_histogram'].values()) == len(prefixes)
+            writer.close()
+            await writer.wait_closed()
+        self.run_with_server(test, batch_window=0.01)
+
+    def test_load_test(self):
+        async def test(server, port):
+            results = await load_test(PREFIXES, port=port, concurrency=4,
+                                      num_requests=50)
+            assert results['requests'] == 50
+            assert results['p50'] <= results['p99']
+            assert results['server']['requests'] == 50
+        for algorithm in ('linear_search', 'sorted_bisect'):
+            self.run_with_server(test, algorithm)
+
+
+if __name__ == '__main__':
+    unittest.main()
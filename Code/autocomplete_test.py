@@ -0,0 +1,160 @@
+#!python3
+
+from autocomplete import (ALGORITHMS, INFIX_ALGORITHMS, iter_lines,
+                          autocomplete_setup, autocomplete_setup_iter,
+                          autocomplete, autocomplete_infix,
+                          autocomplete_batch, autocomplete_count,
+                          autocomplete_parallel, autocomplete_count_parallel,
+                          parse_args, setup_from_file)
+import os
+import tempfile
+import unittest
+
+
+VOCABULARY = ['axle', 'axled', 'axlesmith', 'axletree', 'axe', 'ax',
+              'banana', 'band', 'bandana', 'can', 'cane', 'Axe']
+PREFIXES = ['', 'a', 'ax', 'axl', 'axle', 'axles', 'b', 'ban', 'band',
+            'c', 'cat', 'A', 'z']
+
+
+class AutocompleteTest(unittest.TestCase):
+
+    def test_algorithms_agree_with_linear_search(self):
+        for algorithm in ALGORITHMS:
+            structure = autocomplete_setup(VOCABULARY, algorithm)
+            for prefix in PREFIXES:
+                expected = sorted(word for word in VOCABULARY
+                                  if word.startswith(prefix))
+                completions = autocomplete(prefix, structure, algorithm)
+                assert sorted(completions) == expected
+                count = autocomplete_count(prefix, structure, algorithm)
+                assert count == len(expected)
+
+    def test_batch_agrees_with_single_prefixes(self):
+        # Include repeated prefixes and prefixes out of sorted order
+        prefixes = PREFIXES + ['axl', 'a', 'bandanas', 'ax', 'ca']
+        for algorithm in ALGORITHMS:
+            structure = autocomplete_setup(VOCABULARY, algorithm)
+            batch = autocomplete_batch(prefixes, structure, algorithm)
+            assert len(batch) == len(prefixes)
+            for prefix, completions in zip(prefixes, batch):
+                assert completions == autocomplete(prefix, structure,
+                                                   algorithm)
+            # Verify repeated prefixes get lists that can be changed apart
+            batch[1].append('extra')
+            assert batch[-4] != batch[1]
+            assert autocomplete_batch([], structure, algorithm) == []
+
+    def test_parallel_agrees_with_single_prefixes(self):
+        prefixes = PREFIXES * 3
+        for algorithm in ALGORITHMS:
+            structure = autocomplete_setup(VOCABULARY, algorithm)
+            expected = [autocomplete(prefix, structure, algorithm)
+                        for prefix in prefixes]
+            assert autocomplete_parallel(prefixes, structure, algorithm,
+                                         workers=2) == expected
+            counts = autocomplete_count_parallel(prefixes, structure,
+                                                 algorithm, workers=2)
+            assert counts == [len(completions) for completions in expected]
+
+    def test_parallel_on_no_prefixes_and_bad_workers(self):
+        structure = autocomplete_setup(VOCABULARY, 'trie')
+        assert autocomplete_parallel([], structure, 'trie', workers=2) == []
+        assert autocomplete_count_parallel([], structure, 'trie') == []
+        with self.assertRaises(ValueError):
+            autocomplete_parallel(PREFIXES, structure, 'trie', workers=0)
+        with self.assertRaises(SystemExit):
+            parse_args(['--workers', '0', 'prefixes.txt', 'words.txt'])
+
+    def test_setup_from_stream(self):
+        for algorithm in ALGORITHMS:
+            structure = autocomplete_setup(iter(VOCABULARY), algorithm)
+            for prefix in PREFIXES:
+                expected = sorted(word for word in VOCABULARY
+                                  if word.startswith(prefix))
+                completions = autocomplete(prefix, structure, algorithm)
+                assert sorted(completions) == expected
+
+    def test_setup_from_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'words.txt')
+            with open(filename, 'w') as file:
+                file.write('\n'.join(VOCABULARY) + '\n')
+            for algorithm in ALGORITHMS:
+                structure, size, cached = setup_from_file(filename,
+                                                          algorithm)
+                assert (size, cached) == (len(VOCABULARY), False)
+                assert sorted(autocomplete('ban', structure, algorithm)) == \
+                    ['banana', 'band', 'bandana']
+
+    def test_setup_iter_grows_structure(self):
+        for algorithm in ('linear_search', 'trie', 'sorted_bisect'):
+            structures = autocomplete_setup_iter(iter(VOCABULARY), algorithm,
+                                                 chunk_size=5)
+            # Verify the first chunk can be queried before the rest is loaded
+            structure = next(structures)
+            assert autocomplete('axle', structure, algorithm) == \
+                ['axle', 'axled', 'axlesmith', 'axletree']
+            assert autocomplete('ban', structure, algorithm) == []
+            assert all(other is structure for other in structures)
+            completions = autocomplete('ban', structure, algorithm)
+            assert sorted(completions) == ['banana', 'band', 'bandana']
+            assert len(list(autocomplete_setup_iter([], algorithm))) == 1
+        # Verify a suffix array is only generated once it's complete
+        structures = list(autocomplete_setup_iter(iter(VOCABULARY),
+                                                  'suffix_array', 5))
+        assert len(structures) == 1
+        assert structures[0].size == len(VOCABULARY)
+
+    def test_infix_agrees_with_linear_search(self):
+        fragments = PREFIXES + ['xle', 'ana', 'e', 'ne', 'a']
+        # Repeated words and fragments that occur more than once in a word
+        vocabulary = VOCABULARY + ['banana', 'banana', 'axle']
+        for algorithm in INFIX_ALGORITHMS:
+            structure = autocomplete_setup(vocabulary, algorithm)
+            for fragment in fragments:
+                expected = sorted(set(word for word in vocabulary
+                                      if fragment in word))
+                completions = autocomplete_infix(fragment, structure,
+                                                 algorithm)
+                assert completions == expected
+        with self.assertRaises(ValueError):
+            autocomplete_infix('ax', autocomplete_setup(VOCABULARY, 'trie'),
+                               'trie')
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            autocomplete_setup(VOCABULARY, 'hash_table')
+        with self.assertRaises(ValueError):
+            autocomplete('ax', VOCABULARY, 'hash_table')
+
+
+class IterLinesTest(unittest.TestCase):
+
+    def write_file(self, data):
+        """Write the given bytes to a temporary file and return its name."""
+        file = tempfile.NamedTemporaryFile(delete=False)
+        file.write(data)
+        file.close()
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_iter_lines(self):
+        filename = self.write_file(b'  ax\nband \r\nax\n\ncan')
+        assert list(iter_lines(filename)) == ['ax', 'band', 'ax', '', 'can']
+        assert list(iter_lines(filename, unique=True)) == \
+            ['ax', 'band', '', 'can']
+        assert list(iter_lines(self.write_file(b''))) == []
+
+    def test_iter_lines_encoding(self):
+        filename = self.write_file('caf\xe9\nna\xefve\n'.encode('latin-1'))
+        assert list(iter_lines(filename, encoding='latin-1')) == \
+            ['caf\xe9', 'na\xefve']
+        with self.assertRaises(UnicodeDecodeError):
+            list(iter_lines(filename))
+        assert list(iter_lines(filename, errors='replace')) == \
+            ['caf\ufffd', 'na\ufffdve']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!python3
+
+from collections import OrderedDict
+import sys
+
+
+class CompletionCache:
+    """CompletionCache: A bounded cache of completion lists keyed by prefix,
+    for use by a prefix tree so popular prefixes don't re-traverse a large
+    subtree on every call. The cache can be bounded by number of entries,
+    by an estimate of the bytes its lists and strings use, or both, and
+    evicts entries by least recently used (LRU) or least frequently used (LFU)
+    policy. Counts of hits, misses and evictions are kept to help size it.
+    """
+
+    # Names of the supported eviction policies
+    POLICIES = ('lru', 'lfu')
+
+    def __init__(self, max_entries=1024, max_bytes=None, policy='lru'):
+        """Initialize this cache with the given bounds (None for unbounded)
+        and eviction policy, or raise ValueError if the policy is unknown."""
+        if policy not in CompletionCache.POLICIES:
+            raise ValueError(f'Unknown eviction policy {policy!r}')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        # Map each prefix to its completions, ordered from least to most
+        # recently used (LRU) or within equal frequencies (LFU)
+        self.entries = OrderedDict()
+        # Map each prefix to the estimated bytes and use count of its entry
+        self.entry_bytes = {}
+        self.frequencies = {}
+        # Total estimated bytes of all entries
+        self.nbytes = 0
+        # Counters for sizing the cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        """Return a string representation of this cache."""
+        return (f'CompletionCache({len(self)} entries, {self.nbytes} bytes, '
+                f'policy={self.policy!r})')
+
+    def __len__(self):
+        """Return the number of entries in this cache."""
+        return len(self.entries)
+
+    def __contains__(self, prefix):
+        """Return True if this cache has an entry for the given prefix."""
+        return prefix in self.entries
+
+    def get(self, prefix):
+        """Return the cached completions of the given prefix and count a hit,
+        or return None and count a miss if there is no entry for it."""
+        completions = self.entries.get(prefix, None)
+        if completions is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.frequencies[prefix] += 1
+        # Mark this entry as most recently used
+        self.entries.move_to_end(prefix)
+        return completions
+
+    def put(self, prefix, completions):
+        """Store the given completions of the given prefix, then evict entries
+        until this cache is within its bounds again."""
+        self.invalidate(prefix)
+        nbytes = self._estimate_bytes(prefix, completions)
+        self.entries[prefix] = completions
+        self.entry_bytes[prefix] = nbytes
+        self.frequencies[prefix] = 1
+        self.nbytes += nbytes
+        while self._over_bounds():
+            self._evict(prefix)
+
+    def invalidate(self, prefix):
+        """Remove the entry for the given prefix, if there is one."""
+        if prefix in self.entries:
+            del self.entries[prefix]
+            del self.frequencies[prefix]
+            self.nbytes -= self.entry_bytes.pop(prefix)
+
+    def clear(self):
+        """Remove all entries from this cache, keeping its counters."""
+        self.entries.clear()
+        self.entry_bytes.clear()
+        self.frequencies.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """Return a dict of this cache's counters and current size."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'entries': len(self),
+                'bytes': self.nbytes}
+
+    def _over_bounds(self):
+        """Return True if this cache has more entries or bytes than allowed."""
+        if self.max_entries is not None and len(self) > self.max_entries:
+            return True
+        if self.max_bytes is not None and self.nbytes > self.max_bytes:
+            return True
+        return False
+
+    def _evict(self, newest):
+        """Remove the entry chosen by this cache's eviction policy, avoiding
+        the given newest entry unless it is the only one left."""
+        if self.policy == 'lru' or len(self) == 1:
+            # The first entry is the least recently used
+            prefix = next(iter(self.entries))
+        else:
+            # The first entry with the lowest use count is the least recently
+            # used of the least frequently used entries. The newest entry has
+            # the lowest count of all, so leave it a chance to be used
+            candidates = (prefix for prefix in self.entries
+                          if prefix != newest)
+            prefix = min(candidates, key=self.frequencies.__getitem__)
+        self.invalidate(prefix)
+        self.evictions += 1
+
+    @staticmethod
+    def _estimate_bytes(prefix, completions):
+        """Return an estimate of the bytes used by an entry for the given
+        prefix and list of completion strings."""
+        return (sys.getsizeof(prefix) + sys.getsizeof(completions) +
+                sum(sys.getsizeof(string) for string in completions))
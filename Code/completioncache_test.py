@@ -0,0 +1,93 @@
+#!python3
+
+from completioncache import CompletionCache
+from prefixtree import PrefixTree
+import unittest
+
+
+class CompletionCacheTest(unittest.TestCase):
+
+    def test_get_and_put(self):
+        cache = CompletionCache()
+        assert len(cache) == 0
+        assert cache.get('A') is None
+        cache.put('A', ['A', 'AB'])
+        assert 'A' in cache
+        assert cache.get('A') == ['A', 'AB']
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['entries'] == 1
+        assert cache.stats()['bytes'] > 0
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            CompletionCache(policy='fifo')
+
+    def test_lru_eviction_by_entries(self):
+        cache = CompletionCache(max_entries=2)
+        cache.put('A', ['A'])
+        cache.put('B', ['B'])
+        # Use 'A' so 'B' becomes the least recently used entry
+        cache.get('A')
+        cache.put('C', ['C'])
+        assert 'A' in cache
+        assert 'B' not in cache
+        assert 'C' in cache
+        assert cache.evictions == 1
+
+    def test_lfu_eviction_by_entries(self):
+        cache = CompletionCache(max_entries=2, policy='lfu')
+        cache.put('A', ['A'])
+        cache.put('B', ['B'])
+        # Use 'A' twice and 'B' once, then use 'B' most recently
+        cache.get('A')
+        cache.get('A')
+        cache.get('B')
+        cache.put('C', ['C'])
+        assert 'A' in cache
+        assert 'B' not in cache
+        assert 'C' in cache
+
+    def test_eviction_by_bytes(self):
+        cache = CompletionCache(max_entries=None, max_bytes=2000)
+        for prefix in ['A', 'B', 'C', 'D', 'E']:
+            cache.put(prefix, [prefix * 100] * 2)
+        assert cache.nbytes <= 2000
+        assert len(cache) < 5
+        assert cache.evictions == 5 - len(cache)
+        # Verify the byte count goes back to zero once emptied
+        cache.clear()
+        assert cache.nbytes == 0
+
+    def test_prefix_tree_with_cache(self):
+        cache = CompletionCache()
+        tree = PrefixTree(['ABC', 'ABD', 'XYZ'], cache=cache)
+        assert tree.complete('AB') == ['ABC', 'ABD']
+        assert tree.complete('AB') == ['ABC', 'ABD']
+        tree.complete('X')
+        assert cache.hits == 1
+        assert cache.misses == 2
+        # Verify modifying a returned list doesn't change the cache
+        tree.complete('AB').append('ABE')
+        assert tree.complete('AB') == ['ABC', 'ABD']
+        # Verify insert only invalidates prefixes of the new string
+        tree.insert('ABE')
+        assert 'AB' not in cache
+        assert 'X' in cache
+        assert tree.complete('AB') == ['ABC', 'ABD', 'ABE']
+        # Verify inserting a string already in the tree invalidates nothing
+        tree.insert('ABE')
+        assert 'AB' in cache
+        # Verify delete invalidates prefixes of the deleted string
+        tree.delete('ABE')
+        assert 'AB' not in cache
+        assert tree.complete('AB') == ['ABC', 'ABD']
+        # Verify pages of completions come from the cached list
+        hits = cache.hits
+        assert tree.complete('AB', 1) == ['ABD']
+        assert tree.complete('AB', 0, 1) == ['ABC']
+        assert cache.hits == hits + 2
+
+
+if __name__ == '__main__':
+    unittest.main()
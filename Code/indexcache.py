@@ -0,0 +1,222 @@
+#!python3
+
+import gc
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+
+# Version of the cached file format, included in every cache key so files
+# written by an older version of the structures are never loaded
+FORMAT_VERSION = 3
+
+logger = logging.getLogger(__name__)
+
+
+def _save_trie(tree, path):
+    """Write the given PrefixTree or ArrayPrefixTree to the given path in
+    ArrayPrefixTree's flat format."""
+    tree.save(path)
+
+
+def _load_trie(path):
+    """Return the ArrayPrefixTree saved at the given path, memory-mapped so
+    loading it takes constant time."""
+    from arrayprefixtree import ArrayPrefixTree
+    return ArrayPrefixTree.load(path, mmap=True)
+
+
+# File extension and functions to save and load the structures of
+# algorithms stored in their own format instead of pickled, by algorithm
+FORMATS = {
+    'trie': ('apt', _save_trie, _load_trie),
+}
+
+
+def fingerprint(filename, block_size=1 << 20):
+    """Return a string identifying the contents of the given file, made from
+    its size, modification time and a SHA-256 digest of its contents, so the
+    file's index is rebuilt whenever the file changes."""
+    status = os.stat(filename)
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return f'{status.st_size}-{status.st_mtime_ns}-{digest.hexdigest()}'
+
+
+class IndexCache:
+    """IndexCache: A directory of autocomplete structures built from
+    vocabulary files, each stored in a file named by the algorithm and the
+    vocabulary file's fingerprint, so a process can load a previously built
+    structure instead of setting it up again. Structures are pickled, except
+    for algorithms in FORMATS: prefix trees are saved as ArrayPrefixTree
+    files and memory-mapped when loaded, so a cache hit skips building the
+    tree's nodes. Files are written to a temporary file and renamed into
+    place, so other processes never see a partially written file, and builds
+    of the same file are serialized with a lock file where the platform
+    supports it, so processes starting at once build it only once. Storing a
+    structure removes the files of the same algorithm for any other
+    fingerprint, so the cache holds one structure per algorithm.
+    """
+
+    def __init__(self, directory=None):
+        """Initialize this cache in the given directory, by default
+        $AUTOCOMPLETE_CACHE_DIR or ~/.cache/autocomplete, creating it if
+        needed."""
+        if directory is None:
+            directory = os.environ.get('AUTOCOMPLETE_CACHE_DIR', os.path.join(
+                os.path.expanduser('~'), '.cache', 'autocomplete'))
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        """Return a string representation of this cache."""
+        return f'IndexCache({self.directory!r})'
+
+    def path(self, key, algorithm):
+        """Return the path of the file storing the given algorithm's
+        structure for the vocabulary with the given fingerprint."""
+        extension = FORMATS[algorithm][0] if algorithm in FORMATS \
+            else 'pickle'
+        return os.path.join(self.directory,
+                            f'{algorithm}-v{FORMAT_VERSION}-{key}.{extension}')
+
+    def load(self, key, algorithm):
+        """Return the cached structure of the given algorithm for the
+        vocabulary with the given fingerprint, or None if there is none or it
+        can't be read, which is logged."""
+        path = self.path(key, algorithm)
+        try:
+            if algorithm in FORMATS:
+                return FORMATS[algorithm][2](path)
+            with open(path, 'rb') as file:
+                # Loading creates many objects and no reference cycles, so
+                # pause the cyclic garbage collector as building does
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    return pickle.load(file)
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        except FileNotFoundError:
+            return None
+        except Exception as error:
+            # Corrupt or written by an incompatible version, so build it again
+            logger.warning('Ignoring unreadable index cache file %s: %r',
+                           path, error)
+            return None
+
+    def store(self, key, algorithm, structure):
+        """Write the given structure to the cache atomically, by writing a
+        temporary file in the cache directory and renaming it into place,
+        then remove the files of the same algorithm for other fingerprints."""
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory,
+                                                 suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                if algorithm in FORMATS:
+                    # Saving writes the same file by its path, and syncing
+                    # this descriptor flushes that file all the same
+                    FORMATS[algorithm][1](structure, temp_path)
+                else:
+                    pickle.dump(structure, file, pickle.HIGHEST_PROTOCOL)
+                    file.flush()
+                os.fsync(file.fileno())
+            # Temporary files are only readable by their owner at first
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.path(key, algorithm))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._remove_others(key, algorithm)
+
+    def _remove_others(self, key, algorithm):
+        """Remove the structure and lock files of the given algorithm other
+        than the structure for the given fingerprint, including those of
+        older format versions. A process still building an older version only
+        loses its lock file, which can at worst make another process build
+        that version too."""
+        keep = os.path.basename(self.path(key, algorithm))
+        for name in os.listdir(self.directory):
+            if name.startswith(f'{algorithm}-v') and name != keep and \
+                    not name.endswith('.tmp'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass  # Another process removed it first
+
+    def get_or_build(self, filename, algorithm, build):
+        """Return a pair of the structure of the given algorithm for the given
+        vocabulary file and True if it was loaded from the cache, or else
+        build it by calling build(filename), store it and return False.
+        Structures of algorithms in FORMATS are loaded back from the stored
+        file, so a miss returns the same kind of structure as a hit. If the
+        file changes while it's being built, the built structure is returned
+        but not stored, since it may not match the fingerprint of either
+        version."""
+        key = fingerprint(filename)
+        structure = self.load(key, algorithm)
+        if structure is not None:
+            return structure, True
+        with self._lock(key, algorithm):
+            # Another process may have built it while this one waited
+            structure = self.load(key, algorithm)
+            if structure is not None:
+                return structure, True
+            structure = build(filename)
+            if fingerprint(filename) == key:
+                self.store(key, algorithm, structure)
+                if algorithm in FORMATS:
+                    loaded = self.load(key, algorithm)
+                    if loaded is not None:
+                        structure = loaded
+        return structure, False
+
+    def _lock(self, key, algorithm):
+        """Return a context manager holding an exclusive lock on building
+        the given structure, which does nothing if locks aren't supported."""
+        return _FileLock(self.path(key, algorithm) + '.lock')
+
+    def clear(self):
+        """Remove all cached structures and lock files from this cache's
+        directory."""
+        extensions = ('.pickle', '.lock') + tuple(
+            f'.{extension}' for extension, _, _ in FORMATS.values())
+        for name in os.listdir(self.directory):
+            if name.endswith(extensions):
+                os.remove(os.path.join(self.directory, name))
+
+
+class _FileLock:
+    """Exclusive lock on a file held for the duration of a with block, which
+    the operating system releases if the process holding it exits."""
+
+    def __init__(self, path):
+        """Initialize this lock on the file at the given path."""
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        """Open the lock file and wait until no other process holds it."""
+        if fcntl is not None:
+            self.file = open(self.path, 'a')
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        """Release the lock and close the lock file."""
+        if self.file is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+        return False
+
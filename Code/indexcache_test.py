@@ -0,0 +1,188 @@
+#!python3
+
+from indexcache import IndexCache, fingerprint
+from autocomplete import autocomplete_setup_cached, autocomplete, \
+    autocomplete_batch, autocomplete_count
+from arrayprefixtree import ArrayPrefixTree
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+
+def build_and_record(filename):
+    """Return the lines of the given file, recording each call by appending
+    a line to a log file next to it."""
+    with open(filename + '.log', 'a') as log:
+        log.write('built\n')
+    with open(filename) as file:
+        return file.read().split()
+
+
+class Unloadable:
+    """Object whose pickle raises ValueError when it's loaded."""
+
+    def __reduce__(self):
+        return int, ('not a number',)
+
+
+def get_or_build_in_process(directory, filename):
+    """Load or build the given file's structure in the given cache."""
+    IndexCache(directory).get_or_build(filename, 'test', build_and_record)
+
+
+class IndexCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = IndexCache(os.path.join(self.directory, 'cache'))
+        self.filename = os.path.join(self.directory, 'words.txt')
+        self.write_words('axle\nband\ncan\n')
+
+    def tearDown(self):
+        for root, directories, files in os.walk(self.directory,
+                                                topdown=False):
+            for name in files:
+                os.remove(os.path.join(root, name))
+            for name in directories:
+                os.rmdir(os.path.join(root, name))
+        os.rmdir(self.directory)
+
+    def write_words(self, text):
+        """Write the given text to the vocabulary file."""
+        with open(self.filename, 'w') as file:
+            file.write(text)
+
+    def num_builds(self):
+        """Return the number of times build_and_record built the file."""
+        with open(self.filename + '.log') as log:
+            return len(log.readlines())
+
+    def test_fingerprint(self):
+        key = fingerprint(self.filename)
+        assert fingerprint(self.filename) == key
+        self.write_words('axle\nband\ncat\n')
+        assert fingerprint(self.filename) != key
+
+    def test_get_or_build(self):
+        words, cached = self.cache.get_or_build(self.filename, 'test',
+                                                build_and_record)
+        assert (words, cached) == (['axle', 'band', 'can'], False)
+        words, cached = self.cache.get_or_build(self.filename, 'test',
+                                                build_and_record)
+        assert (words, cached) == (['axle', 'band', 'can'], True)
+        assert self.num_builds() == 1
+        # Verify changing the file builds it again
+        self.write_words('axle\nband\ncat\n')
+        words, cached = self.cache.get_or_build(self.filename, 'test',
+                                                build_and_record)
+        assert (words, cached) == (['axle', 'band', 'cat'], False)
+        assert self.num_builds() == 2
+        # Verify no temporary files are left behind
+        names = os.listdir(self.cache.directory)
+        assert not any(name.endswith('.tmp') for name in names)
+        self.cache.clear()
+        assert not any(name.endswith('.pickle')
+                       for name in os.listdir(self.cache.directory))
+
+    def test_corrupt_file_is_rebuilt(self):
+        key = fingerprint(self.filename)
+        with open(self.cache.path(key, 'test'), 'wb') as file:
+            file.write(b'not a pickle')
+        assert self.cache.load(key, 'test') is None
+        words, cached = self.cache.get_or_build(self.filename, 'test',
+                                                build_and_record)
+        assert (words, cached) == (['axle', 'band', 'can'], False)
+
+    def test_unloadable_file_is_logged_and_rebuilt(self):
+        key = fingerprint(self.filename)
+        self.cache.store(key, 'test', Unloadable())
+        with self.assertLogs('indexcache', 'WARNING'):
+            assert self.cache.load(key, 'test') is None
+        with self.assertLogs('indexcache', 'WARNING'):
+            words, cached = self.cache.get_or_build(self.filename, 'test',
+                                                    build_and_record)
+        assert (words, cached) == (['axle', 'band', 'can'], False)
+
+    def test_file_changed_during_build_is_not_stored(self):
+        def build_and_change(filename):
+            words = build_and_record(filename)
+            self.write_words('axle\nband\ncat\ndog\n')
+            return words
+        words, cached = self.cache.get_or_build(self.filename, 'test',
+                                                build_and_change)
+        assert (words, cached) == (['axle', 'band', 'can'], False)
+        # Verify the new contents are built instead of loading the old ones
+        words, cached = self.cache.get_or_build(self.filename, 'test',
+                                                build_and_record)
+        assert (words, cached) == (['axle', 'band', 'cat', 'dog'], False)
+        assert self.num_builds() == 2
+
+    def test_storing_removes_other_fingerprints(self):
+        self.cache.get_or_build(self.filename, 'test', build_and_record)
+        self.cache.get_or_build(self.filename, 'other', build_and_record)
+        old_path = self.cache.path(fingerprint(self.filename), 'test')
+        self.write_words('axle\nband\ncat\n')
+        self.cache.get_or_build(self.filename, 'test', build_and_record)
+        new_path = self.cache.path(fingerprint(self.filename), 'test')
+        names = sorted(os.listdir(self.cache.directory))
+        # Only the newest structure of each algorithm and no lock files of
+        # older ones are left
+        assert os.path.basename(old_path) not in names
+        assert os.path.basename(old_path) + '.lock' not in names
+        assert os.path.basename(new_path) in names
+        assert sum(name.startswith('other-') and name.endswith('.pickle')
+                   for name in names) == 1
+
+    def test_trie_is_cached_as_memory_mapped_array_tree(self):
+        structure, cached = autocomplete_setup_cached(
+            self.filename, 'trie', self.cache.directory)
+        assert cached is False
+        # Verify a miss returns the same read-only tree as a hit
+        assert isinstance(structure, ArrayPrefixTree)
+        assert structure.mapping is not None
+        structure.close()
+        path = self.cache.path(fingerprint(self.filename), 'trie')
+        assert path.endswith('.apt')
+        structure, cached = autocomplete_setup_cached(
+            self.filename, 'trie', self.cache.directory)
+        assert cached is True
+        assert isinstance(structure, ArrayPrefixTree)
+        assert structure.mapping is not None  # Loaded without building
+        assert autocomplete_batch(['a', 'b', 'ba', 'x'], structure,
+                                  'trie') == [['axle'], ['band'], ['band'], []]
+        assert autocomplete_count('', structure, 'trie') == 3
+        assert autocomplete_count('ba', structure, 'trie') == 1
+        structure.close()
+        # Verify a corrupt tree file is rebuilt
+        with open(path, 'wb') as file:
+            file.write(b'APT1 truncated')
+        with self.assertLogs('indexcache', 'WARNING'):
+            structure, cached = autocomplete_setup_cached(
+                self.filename, 'trie', self.cache.directory)
+        assert cached is False
+
+    def test_processes_starting_at_once_build_once(self):
+        processes = [multiprocessing.Process(
+                         target=get_or_build_in_process,
+                         args=(self.cache.directory, self.filename))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+        assert self.num_builds() == 1
+
+    def test_autocomplete_setup_cached(self):
+        for algorithm in ('linear_search', 'trie', 'sorted_bisect',
+                          'suffix_array'):
+            for expected_cached in (False, True):
+                structure, cached = autocomplete_setup_cached(
+                    self.filename, algorithm, self.cache.directory)
+                assert cached is expected_cached
+                assert autocomplete('ba', structure, algorithm) == ['band']
+
+
+if __name__ == '__main__':
+    unittest.main()
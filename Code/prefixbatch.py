@@ -0,0 +1,43 @@
+#!python3
+
+from bisect import bisect_left
+
+
+def complete_batch(prefixes, complete, narrow=None):
+    """Return a list of the lists of strings that start with each of the
+    given prefixes, in the same order as the prefixes, where complete(prefix)
+    returns a prefix's completions in sorted order. Prefixes are resolved in
+    sorted order, and only those that don't extend an earlier prefix are
+    passed to complete. The completions of a longer prefix (such as 'mate'
+    after 'mat') are next to each other in the sorted completions of the
+    longest earlier prefix it extends, so they are sliced from that list
+    instead of being found again. If narrow(words, prefix) is given, it finds
+    them in that list instead, such as for completions in another order.
+    Running time: O(log n + k) to slice k completions from a list of n"""
+    if narrow is None:
+        narrow = slice_completions
+    completions = {}
+    # Stack of resolved prefixes, each extending the one below it,
+    # paired with their completions
+    stack = []
+    for prefix in sorted(set(prefixes)):
+        # Find the longest resolved prefix that this prefix extends
+        while len(stack) > 0 and not prefix.startswith(stack[-1][0]):
+            stack.pop()
+        if len(stack) == 0:
+            words = complete(prefix)
+        else:
+            words = narrow(stack[-1][1], prefix)
+        completions[prefix] = words
+        stack.append((prefix, words))
+    # Copy lists so repeated prefixes don't share one list
+    return [list(completions[prefix]) for prefix in prefixes]
+
+
+def slice_completions(words, prefix):
+    """Return a list of the strings in the given sorted list that start with
+    the given prefix, which are next to each other in sorted order."""
+    start = end = bisect_left(words, prefix)
+    while end < len(words) and words[end].startswith(prefix):
+        end += 1
+    return words[start:end]
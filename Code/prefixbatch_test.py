@@ -0,0 +1,53 @@
+#!python3
+
+from prefixbatch import complete_batch, slice_completions
+import unittest
+
+
+WORDS = ['ma', 'mat', 'mate', 'math', 'moon', 'nap', 'nape']
+
+
+class PrefixBatchTest(unittest.TestCase):
+
+    def test_slice_completions(self):
+        assert slice_completions(WORDS, 'mat') == ['mat', 'mate', 'math']
+        assert slice_completions(WORDS, 'n') == ['nap', 'nape']
+        assert slice_completions(WORDS, 'mx') == []
+        assert slice_completions(WORDS, '') == WORDS
+
+    def test_complete_batch_only_completes_shortest_prefixes(self):
+        completed = []
+
+        def complete(prefix):
+            completed.append(prefix)
+            return [word for word in WORDS if word.startswith(prefix)]
+
+        prefixes = ['mat', 'm', 'ma', 'nap', 'x', 'm', 'mo', 'math']
+        batch = complete_batch(prefixes, complete)
+        assert batch == [complete(prefix) for prefix in prefixes]
+        # Verify only prefixes that extend no other prefix were completed
+        assert completed[:3] == ['m', 'nap', 'x']
+        # Verify repeated prefixes get their own lists
+        assert batch[1] == batch[5] and batch[1] is not batch[5]
+
+    def test_complete_batch_with_narrow(self):
+        words = ['moon', 'nap', 'mat', 'ma', 'math']
+        narrowed = []
+
+        def search(words, prefix):
+            narrowed.append(prefix)
+            return [word for word in words if word.startswith(prefix)]
+
+        batch = complete_batch(['mat', 'n', 'm'],
+                               lambda prefix: search(words, prefix), search)
+        # Verify completions keep the order of the unsorted words
+        assert batch == [['mat', 'math'], ['nap'],
+                         ['moon', 'mat', 'ma', 'math']]
+        assert narrowed == ['m', 'mat', 'n']
+
+    def test_complete_batch_on_no_prefixes(self):
+        assert complete_batch([], lambda prefix: WORDS) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
 #!python3
 
+import gc
+from contextlib import contextmanager
+
+from arrayprefixtree import ArrayPrefixTree
+from prefixbatch import complete_batch
 from prefixtreenode import PrefixTreeNode
+from priorityqueue import PriorityQueue
 
 
 class PrefixTree:
@@ -19,16 +25,113 @@ class PrefixTree:
     # Constant for the start character stored in the prefix tree's root node
     START_CHARACTER = ''
 
-    def __init__(self, strings=None):
-        """Initialize this prefix tree and insert the given strings, if any."""
+    def __init__(self, strings=None, cache=None, snapshots=False):
+        """Initialize this prefix tree and insert the given strings, if any.
+        If a CompletionCache is given, complete stores its results there. If
+        snapshots is True, enable snapshots once the strings are inserted."""
         # Create a new root node with the start character
         self.root = PrefixTreeNode(PrefixTree.START_CHARACTER)
         # Count the number of strings inserted into the tree
         self.size = 0
+        # Cache of completions by prefix, set after the initial strings are
+        # inserted so building doesn't pay for invalidating empty entries
+        self.cache = None
+        # Once snapshots are enabled, the set of nodes changed since the last
+        # published version, which can be changed again without copying
+        self._owned = None
+        # Root node and size of the last published version, if any
+        self._published = None
+        # Number of open batch blocks, which defer publishing
+        self._batch_depth = 0
         # Insert each string, if any were given
         if strings is not None:
             for string in strings:
                 self.insert(string)
+        self.cache = cache
+        if snapshots:
+            self.enable_snapshots()
+
+    @classmethod
+    def from_sorted(cls, strings):
+        """Return a new prefix tree containing the given strings, which may be
+        any iterable, including a lazy generator over the lines of a file.
+        Running time: O(n) for sorted strings with n characters in total.
+        Unsorted strings are still inserted correctly, just with less reuse.
+        """
+        tree = cls()
+        tree.extend(strings)
+        return tree
+
+    def extend(self, strings):
+        """Insert the given strings, which may be any iterable, into this
+        prefix tree. Each string reuses the path of the prefix it shares with
+        the previous string instead of searching from the root, so when the
+        strings are in sorted order only the new suffix of each string is
+        walked. Strings keep their current weights (0 if new).
+        Running time: O(n) for sorted strings with n characters in total."""
+        if self._owned is not None:
+            # Copy the path of each string instead of changing shared nodes,
+            # and publish them all as one version
+            with self.batch():
+                for string in strings:
+                    self.insert(string)
+            return
+        # Nodes along the path of the previous string, indexed by depth
+        path = [self.root]
+        previous = ''
+        # Building creates many nodes and no reference cycles, so pause the
+        # cyclic garbage collector instead of letting it rescan the tree
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for string in strings:
+                # Find how many characters this string shares with the previous
+                common = 0
+                limit = min(len(previous), len(string))
+                while common < limit and previous[common] == string[common]:
+                    common += 1
+                # Reuse the path up to the shared prefix and walk the rest
+                del path[common + 1:]
+                node = path[-1]
+                for index in range(common, len(string)):
+                    char = string[index]
+                    child = node.children.get(char, None)
+                    if child is None:
+                        # Once a character is new, the rest of the string is
+                        # too, so add its nodes without looking them up
+                        for char in string[index:]:
+                            child = PrefixTreeNode(char)
+                            node.children[char] = child
+                            path.append(child)
+                            node = child
+                        break
+                    path.append(child)
+                    node = child
+                # Only count the string if it wasn't already in the tree
+                if not node.is_terminal():
+                    node.terminal = True
+                    self.size += 1
+                    for path_node in path:
+                        path_node.count += 1
+                    self._invalidate_prefixes(string)
+                previous = string
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def __reduce__(self):
+        """Return how to pickle this prefix tree: as its strings in sorted
+        order and the weights that aren't 0, which are rebuilt into a tree
+        with from_sorted when unpickled. This is far smaller and faster to
+        pickle and unpickle than its nodes, and avoids nesting deeply."""
+        strings = self.strings()
+        weights = {}
+        for string in strings:
+            node = self._find_node(string)[0]
+            if node.weight != 0:
+                weights[string] = node.weight
+        return _unpickle_prefix_tree, (type(self), strings, weights,
+                                       self.cache)
 
     def __repr__(self):
         """Return a string representation of this prefix tree."""
@@ -43,8 +146,11 @@ class PrefixTree:
         data = self._find_node(string)
         return data[0].is_terminal() and data[1] == len(string)
 
-    def insert(self, string):
-        """Insert the given string into this prefix tree."""
+    def insert(self, string, weight=None):
+        """Insert the given string into this prefix tree with the given weight,
+        or keep its current weight (0 if new) if no weight is given. Each node
+        on the string's path tracks the maximum weight in its subtree."""
+        self._copy_path(string)
         # Find the prefix of what's already there
         prefix_data = self._find_node(string)
         node = prefix_data[0]
@@ -56,10 +162,178 @@ class PrefixTree:
                 new_node = PrefixTreeNode(char)
                 node.add_child(char, new_node)
                 node = node.get_child(char)
+
+        # Only count the string if it wasn't already in the tree, which may
+        # be the case even if its whole path was (such as 'A' after 'ABC')
+        if not node.is_terminal():
             self.size += 1
+            self._update_counts(string, 1)
+            self._invalidate_prefixes(string)
 
         # Set the node to terminal regardless of if a new one was needed
         node.terminal = True
+        if weight is not None:
+            node.weight = weight
+            self._update_max_weight(string, weight)
+        self._finish_write(string)
+
+    def delete(self, string):
+        """Remove the given string from this prefix tree, or raise ValueError
+        if it isn't in this tree. Nodes that no longer lead to any terminal
+        node are pruned, so memory doesn't grow as strings churn.
+        Running time: O(m*b) for a string of length m and nodes with b children
+        """
+        self._copy_path(string)
+        # Record the nodes along the string's path
+        path = [self.root]
+        for char in string:
+            node = path[-1].children.get(char, None)
+            if node is None:
+                raise ValueError(f'String not found: {string!r}')
+            path.append(node)
+        node = path[-1]
+        if not node.is_terminal():
+            raise ValueError(f'String not found: {string!r}')
+        node.terminal = False
+        node.weight = 0
+        self.size -= 1
+        for node in path:
+            node.count -= 1
+        self._invalidate_prefixes(string)
+        # Prune nodes from the end of the path up until a node that is
+        # terminal or still has other children
+        depth = len(string)
+        while depth > 0 and not path[depth].is_terminal() and \
+                path[depth].num_children() == 0:
+            path[depth - 1].remove_child(string[depth - 1])
+            path.pop()
+            depth -= 1
+        # Lower the maximum subtree weights along the rest of the path
+        for node in reversed(path):
+            weights = [child.max_weight for child in node.children.values()]
+            if node.is_terminal():
+                weights.append(node.weight)
+            node.max_weight = max(weights, default=0)
+        self._finish_write(string)
+
+    def enable_snapshots(self):
+        """Publish the current version of this prefix tree for snapshot to
+        return, and from then on copy nodes instead of changing them in place
+        if they are part of a published version. Each write (or batch of
+        writes) copies only the nodes along the paths it changes and then
+        publishes a new version, so published versions never change and
+        share all of their other nodes. The writer must call this before
+        any reader calls snapshot, since a write already in progress when
+        snapshots are enabled changes nodes in place."""
+        if self._owned is None:
+            self._owned = set()
+            self._publish()
+
+    def snapshot(self):
+        """Return a new prefix tree view of the last published version of this
+        prefix tree, which readers can search for the whole of a query without
+        locks while a single writer keeps changing this tree. Writes to a view
+        also copy the nodes they change, so they never affect other versions.
+        Raise ValueError if snapshots aren't enabled, which only the writer
+        can do safely.
+        Running time: O(1)"""
+        if self._published is None:
+            raise ValueError('Snapshots are not enabled; call '
+                             'enable_snapshots before sharing this tree')
+        root, size = self._published
+        view = PrefixTree.__new__(type(self))
+        view.root = root
+        view.size = size
+        view.cache = None
+        view._owned = set()
+        view._published = (root, size)
+        view._batch_depth = 0
+        return view
+
+    @contextmanager
+    def batch(self):
+        """Return a context manager that publishes one version when its block
+        ends instead of one version after each write in the block, so nodes
+        changed by several writes in the block are only copied once."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._owned is not None:
+                self._publish()
+
+    def _publish(self):
+        """Make the current root node and size the last published version, so
+        all current nodes are shared with it and copied before changing."""
+        self._published = (self.root, self.size)
+        self._owned.clear()
+
+    def _copy_path(self, string):
+        """If snapshots are enabled, replace each node along the existing path
+        of the given string that is shared with a published version by a copy
+        of it, linked from the copy of its parent, so it can be changed.
+        Running time: O(m*b) for a string of length m and nodes with b children
+        """
+        owned = self._owned
+        if owned is None:
+            return
+        node = self.root
+        if node not in owned:
+            node = node.copy()
+            owned.add(node)
+            self.root = node
+        for char in string:
+            child = node.children.get(char, None)
+            if child is None:
+                break
+            if child not in owned:
+                child = child.copy()
+                owned.add(child)
+                node.children[char] = child
+            node = child
+
+    def _finish_write(self, string):
+        """If snapshots are enabled, record the nodes added along the path of
+        the given string as changed, and publish a new version unless this
+        write is part of a batch."""
+        owned = self._owned
+        if owned is None:
+            return
+        node = self.root
+        for char in string:
+            node = node.children.get(char, None)
+            if node is None:
+                break
+            owned.add(node)
+        if self._batch_depth == 0:
+            self._publish()
+
+    def _invalidate_prefixes(self, string):
+        """Remove cached completions of each prefix of the given string, which
+        change when the string is inserted or deleted."""
+        if self.cache is not None:
+            for i in range(len(string) + 1):
+                self.cache.invalidate(string[:i])
+
+    def _update_counts(self, string, amount):
+        """Add the given amount to the subtree string count of each node along
+        the path of the given string."""
+        node = self.root
+        node.count += amount
+        for char in string:
+            node = node.children[char]
+            node.count += amount
+
+    def _update_max_weight(self, string, weight):
+        """Raise the maximum subtree weight of each node along the path of the
+        given string to at least the given weight. Lowering a string's weight
+        leaves the old maximum in place, which is still a valid upper bound."""
+        node = self.root
+        node.max_weight = max(node.max_weight, weight)
+        for char in string:
+            node = node.children[char]
+            node.max_weight = max(node.max_weight, weight)
 
     def _find_node(self, string):
         """Return a pair containing the deepest node in this prefix tree that
@@ -85,42 +359,186 @@ class PrefixTree:
         # Return the last node if the loop completes
         return node, i + 1
 
-    def complete(self, prefix):
-        """Return a list of all strings stored in this prefix tree that start
-        with the given prefix string.
+    def count(self, prefix):
+        """Return the number of strings stored in this prefix tree that start
+        with the given prefix string, without visiting any of them.
+        Running time: O(m) for a prefix of length m"""
+        node, depth = self._find_node(prefix)
+        # If the whole prefix isn't found, there are no completions
+        if depth != len(prefix):
+            return 0
+        return node.count
+
+    def complete(self, prefix, offset=0, limit=None):
+        """Return a list of strings stored in this prefix tree that start with
+        the given prefix string, in sorted order, skipping the first `offset`
+        strings and returning at most `limit` strings if a limit is given. If
+        this tree has a cache, completions are read from it when possible, and
+        stored in it when all completions are requested.
         """
-        # Create a list of completions in prefix tree
-        completions = []
+        if self.cache is None:
+            return list(self.iter_complete(prefix, limit, offset))
+        if offset == 0 and limit is None:
+            completions = self.cache.get(prefix)
+            if completions is None:
+                completions = list(self.iter_complete(prefix))
+                self.cache.put(prefix, completions)
+            # Return a copy so callers can't modify the cached list
+            return list(completions)
+        # Only page through the cached list if it's already there
+        if prefix in self.cache:
+            completions = self.cache.get(prefix)
+            end = None if limit is None else offset + max(limit, 0)
+            return completions[offset:end]
+        return list(self.iter_complete(prefix, limit, offset))
+
+    def complete_batch(self, prefixes):
+        """Return a list of the lists of strings that start with each of the
+        given prefixes, in the same order as the prefixes. Prefixes are
+        resolved in sorted order, and only those that don't extend an earlier
+        prefix walk down and traverse their subtree. The completions of a
+        longer prefix (such as 'mate' after 'mat') are sliced from the sorted
+        completions of the prefix it extends, so no subtree is traversed
+        twice."""
+        return complete_batch(prefixes, self.complete)
+
+    def iter_complete(self, prefix, limit=None, offset=0):
+        """Generate strings stored in this prefix tree that start with the
+        given prefix string in sorted order, skipping the first `offset` and
+        stopping after `limit` strings if a limit is given. Children are
+        visited in sorted order so completions come out already sorted, only
+        the first `limit` are ever built, and subtrees with fewer strings than
+        the remaining offset are skipped using their counts.
+        Running time: O(m + n) to generate n strings after a prefix of length
+        m, without sorting and without visiting the rest of the subtree
+        """
+        if limit is not None and limit <= 0:
+            return
         # Skip to after the prefix
-        node_depth = self._find_node(prefix)
-        # If the prefix isn't found, return an empty list
-        if len(prefix) > 0 and node_depth[1] == 0:
-            return completions
+        node, depth = self._find_node(prefix)
+        # If the whole prefix isn't found, there are no completions
+        if depth != len(prefix):
+            return
+        yield from self._iter_subtree(node, prefix, limit, offset)
 
+    def _iter_subtree(self, node, prefix, limit=None, offset=0):
+        """Generate strings stored in the subtree of the given node, whose path
+        from the root spells the given prefix, in sorted order, skipping the
+        first `offset` and stopping after `limit` strings if a limit is given.
+        """
+        # Shared buffer of characters along the path from the prefix's node,
+        # joined only when a terminal node is reached
+        path = [prefix]
+        count = 0
         # Use a stack to conduct iterative depth-first traversal
-        # Tuple of current node and depth
-        stack = [(node_depth[0], node_depth[1])]
-        # Base of all strings will be prefix
-        string = prefix
+        # Tuple of current node and its depth below the prefix's node
+        stack = [(node, 0)]
         while len(stack) > 0:
-            # Each iteration, pop the last element of the stack
-            node_depth = stack.pop()
-            # Separate into two variables for ease of use
-            node = node_depth[0]
-            depth = node_depth[1]
-            # Add children of current node to stack
-            if node.num_children() > 0:
-                for child in node.children.values():
-                    stack.append((child, depth + 1))
-            # Set the string to the prefix of the node and add character
-            string = string[:depth - 1]
-            string += node.character
-
-            # Add to the list of completions if node is terminal
+            node, depth = stack.pop()
+            if offset >= node.count > 0:
+                # Skip this whole subtree without visiting its strings
+                offset -= node.count
+                continue
+            if depth > 0:
+                # Replace the characters below this node's parent
+                del path[depth:]
+                path.append(node.character)
             if node.is_terminal():
-                completions.append(string)
-        # Return strings in alphabetical order
-        return sorted(completions)
+                if offset > 0:
+                    offset -= 1
+                else:
+                    yield ''.join(path)
+                    count += 1
+                    if count == limit:
+                        return
+            # Push children in reverse order so they are popped in order
+            for char in sorted(node.children, reverse=True):
+                stack.append((node.children[char], depth + 1))
+
+    def fuzzy_complete(self, prefix, max_edits):
+        """Return a list of all strings stored in this prefix tree that start
+        with a string within `max_edits` edits (insertions, deletions or
+        substitutions of one character) of the given prefix, in sorted order.
+        Each node keeps a row of Levenshtein distances between the prefix's
+        leading characters and the node's path, computed from its parent's
+        row, and branches whose row has no distance within `max_edits` are
+        pruned. Once a node's path is close enough to the whole prefix, all
+        strings in its subtree are completions.
+        Running time: O(m*v) for a prefix of length m and v nodes visited,
+        which is much fewer than all nodes when `max_edits` is small
+        """
+        completions = []
+        # Distances from each leading part of the prefix to the empty string
+        first_row = list(range(len(prefix) + 1))
+        # Stack of nodes paired with their path and row of distances
+        stack = [(self.root, '', first_row)]
+        while len(stack) > 0:
+            node, string, row = stack.pop()
+            if row[-1] <= max_edits:
+                # Every string below this node starts close to the prefix
+                completions.extend(self._iter_subtree(node, string))
+                continue
+            if min(row) > max_edits:
+                # Distances never decrease further down, so prune this branch
+                continue
+            # Push children in reverse order so they are popped in order
+            for char in sorted(node.children, reverse=True):
+                next_row = [row[0] + 1]
+                for i in range(1, len(prefix) + 1):
+                    cost = 0 if prefix[i - 1] == char else 1
+                    next_row.append(min(next_row[i - 1] + 1,  # Insertion
+                                        row[i] + 1,  # Deletion
+                                        row[i - 1] + cost))  # Substitution
+                stack.append((node.children[char], string + char, next_row))
+        return completions
+
+    def top_k(self, prefix, k):
+        """Return a list of the `k` strings with the greatest weight that start
+        with the given prefix string, in order of decreasing weight (strings
+        with equal weights are in sorted order). Nodes are searched best-first
+        by the maximum weight in their subtree, so subtrees that can't beat the
+        k-th result found are never expanded.
+        Running time: O(m + k*h*b*log(k*h*b)) for a prefix of length m, strings
+        of height h below it and nodes with b children, independent of how many
+        strings start with the prefix
+        """
+        top_strings = []
+        node, depth = self._find_node(prefix)
+        # If the whole prefix isn't found, there are no completions
+        if k <= 0 or depth != len(prefix):
+            return top_strings
+        # Queue of (string, node) pairs for subtrees still to expand and
+        # (string, None) pairs for completed strings. Priorities order by
+        # decreasing weight, then by string, then strings before subtrees, so
+        # no two priorities are ever equal
+        queue = PriorityQueue()
+        queue.enqueue((prefix, node), (-node.max_weight, prefix, 1))
+        while not queue.is_empty() and len(top_strings) < k:
+            string, node = queue.dequeue()
+            if node is None:
+                # No subtree left in the queue can beat this string's weight
+                top_strings.append(string)
+                continue
+            if node.is_terminal():
+                queue.enqueue((string, None), (-node.weight, string, 0))
+            for char, child in node.children.items():
+                child_string = string + char
+                queue.enqueue((child_string, child),
+                              (-child.max_weight, child_string, 1))
+        return top_strings
+
+    def save(self, path):
+        """Write this prefix tree to a binary file at the given path in the
+        flat format of ArrayPrefixTree, which load can memory-map."""
+        ArrayPrefixTree.from_tree(self).save(path)
+
+    @staticmethod
+    def load(path, mmap=True):
+        """Return an ArrayPrefixTree read from a file written by save, which
+        has the same contains, complete and strings methods as this class. If
+        mmap is True, it answers queries directly against the memory-mapped
+        file without deserializing it into node objects."""
+        return ArrayPrefixTree.load(path, mmap)
 
     def strings(self):
         """Return a list of all strings stored in this prefix tree."""
@@ -141,6 +559,16 @@ class PrefixTree:
             visit(node)
 
 
+def _unpickle_prefix_tree(cls, strings, weights, cache):
+    """Return a prefix tree of the given class rebuilt from the given strings
+    in sorted order, weights and cache, as pickled by PrefixTree.__reduce__."""
+    tree = cls.from_sorted(strings)
+    for string, weight in weights.items():
+        tree.insert(string, weight)
+    tree.cache = cache
+    return tree
+
+
 def create_prefix_tree(strings):
     print(f'strings: {strings}')
 
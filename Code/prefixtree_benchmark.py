@@ -0,0 +1,232 @@
+#!python3
+
+import gc
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+from arrayprefixtree import ArrayPrefixTree
+from autocomplete_benchmark import percentile
+from prefixtree import PrefixTree
+from prefixtreenode import PrefixTreeNode
+from radixtree import RadixTree
+from workload import random_words, zipf_prefixes
+
+
+class UnslottedNode:
+    """PrefixTreeNode without __slots__, which keeps its attributes in a
+    __dict__ instead, to measure the memory that __slots__ saves."""
+
+    __init__ = PrefixTreeNode.__init__
+
+
+def measure_memory(build, strings):
+    """Return a pair containing the structure built by calling the given build
+    function with the given strings and the number of bytes it allocated."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    structure = build(strings)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return structure, after - before
+
+
+def measure_lookups(tree, strings, repeat=5):
+    """Return the best average time in seconds of `tree.contains` over each of
+    the given strings, taken over the given number of repeated runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for string in strings:
+            tree.contains(string)
+        best = min(best, time.perf_counter() - start_time)
+    return best / len(strings)
+
+
+def compare_layouts(count=200000, num_lookups=20000, seed=0):
+    """Build a PrefixTree, an ArrayPrefixTree and a RadixTree with the same
+    random words and print the number of nodes, the memory used per string and
+    the average latency of a lookup."""
+    words = random_words(count, seed=seed)
+    lookups = random.Random(seed).sample(words, min(num_lookups, len(words)))
+    print(f'Vocabulary size: {len(words)} words, '
+          f'{sum(len(word) for word in words)} characters')
+    print()
+    print(f'{"layout":<16} {"nodes":>10} {"bytes/string":>14} '
+          f'{"lookup (usec)":>14}')
+    for build in (PrefixTree, ArrayPrefixTree, RadixTree):
+        tree, nbytes = measure_memory(build, words)
+        if isinstance(tree, ArrayPrefixTree):
+            num_nodes = tree.num_nodes()
+        else:
+            num_nodes = count_nodes(tree)
+        latency = measure_lookups(tree, lookups)
+        print(f'{build.__name__:<16} {num_nodes:>10} '
+              f'{nbytes / len(words):>14.1f} {latency * 1e6:>14.2f}')
+        del tree
+
+
+def compare_node_sizes(count=200000):
+    """Create the given number of prefix tree nodes with and without
+    __slots__ and print the memory used per node, including its empty
+    structure of children nodes and its reference in a list."""
+    characters = ['a'] * count
+    print(f'{"node":<16} {"bytes/node":>14}')
+    for node_class in (PrefixTreeNode, UnslottedNode):
+        nodes, nbytes = measure_memory(
+            lambda characters: [node_class(char) for char in characters],
+            characters)
+        print(f'{node_class.__name__:<16} {nbytes / count:>14.1f}')
+        del nodes
+
+
+def compare_builds(count=200000, repeat=3, seed=0):
+    """Build a PrefixTree from the same sorted random words by calling insert
+    for each word and with from_sorted, and print the best build times."""
+    words = random_words(count, seed=seed)
+    print(f'Vocabulary size: {len(words)} words, '
+          f'{sum(len(word) for word in words)} characters')
+    print()
+    timings = {}
+    for name, build in [('insert', PrefixTree),
+                        ('from_sorted', PrefixTree.from_sorted)]:
+        best = float('inf')
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            build(iter(words))
+            best = min(best, time.perf_counter() - start_time)
+        timings[name] = best
+        print(f'{name:<16} {best:>10.3f} sec')
+    print(f'Speedup: {timings["insert"] / timings["from_sorted"]:.2f}x')
+
+
+def measure_writes(words, new_words, mode, batch_size):
+    """Return the average time in seconds and bytes still allocated after
+    inserting each of the given new words into a PrefixTree of the given
+    words, changing nodes in place, publishing a snapshot after every write
+    or after every `batch_size` writes, or keeping every snapshot."""
+    tree = PrefixTree.from_sorted(words)
+    if mode != 'in place':
+        tree.enable_snapshots()
+    snapshots = []
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start_time = time.perf_counter()
+    for start in range(0, len(new_words), batch_size):
+        with tree.batch():
+            for word in new_words[start:start + batch_size]:
+                tree.insert(word)
+                if mode == 'keep all':
+                    snapshots.append(tree.snapshot())
+    elapsed = time.perf_counter() - start_time
+    del snapshots
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    if mode == 'keep all':
+        after = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed / len(new_words), (after - before) / len(new_words)
+
+
+def measure_readers(tree, prefixes, num_readers, writer_words=None):
+    """Return a sorted list of the latencies in seconds of each of the given
+    prefixes completed from a new snapshot by each of the given number of
+    reader threads, while a writer thread inserts the given words in batches
+    of 100 if any are given."""
+    latencies = []
+    done = threading.Event()
+
+    def read():
+        for prefix in prefixes:
+            start_time = time.perf_counter()
+            tree.snapshot().complete(prefix)
+            latencies.append(time.perf_counter() - start_time)
+
+    def write():
+        for start in range(0, len(writer_words), 100):
+            if done.is_set():
+                return
+            with tree.batch():
+                for word in writer_words[start:start + 100]:
+                    tree.insert(word)
+
+    readers = [threading.Thread(target=read) for _ in range(num_readers)]
+    writer = threading.Thread(target=write) if writer_words else None
+    if writer is not None:
+        writer.start()
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    done.set()
+    if writer is not None:
+        writer.join()
+    return sorted(latencies)
+
+
+def compare_snapshots(count=200000, num_writes=20000, batch_size=100,
+                      num_readers=4, num_queries=2000, seed=0):
+    """Insert random new words into a PrefixTree of random words in place and
+    with copy-on-write snapshots, and print the time and memory per write and
+    the latency of readers completing prefixes from snapshots with and
+    without a concurrent writer."""
+    words = random_words(count + num_writes, seed=seed)
+    new_words = random.Random(seed).sample(words, num_writes)
+    chosen = set(new_words)
+    words = [word for word in words if word not in chosen]
+    print(f'Vocabulary size: {len(words)} words, {num_writes} writes')
+    print()
+    print(f'{"writes":<24} {"usec/write":>12} {"bytes/write":>12}')
+    for mode, size in [('in place', num_writes),
+                       ('snapshot per write', 1),
+                       (f'snapshot per {batch_size}', batch_size),
+                       ('keep all', 1)]:
+        latency, nbytes = measure_writes(words, new_words, mode, size)
+        print(f'{mode:<24} {latency * 1e6:>12.2f} {nbytes:>12.1f}')
+    print()
+    tree = PrefixTree.from_sorted(words)
+    tree.enable_snapshots()
+    prefixes = zipf_prefixes(words, num_queries, max_length=4, seed=seed)
+    print(f'{"readers":<24} {"p50 (usec)":>12} {"p99 (usec)":>12}')
+    for name, writer_words in [('idle', None), ('under writes', new_words)]:
+        latencies = measure_readers(tree, prefixes, num_readers,
+                                    writer_words)
+        print(f'{name:<24} {percentile(latencies, 0.50) * 1e6:>12.1f} '
+              f'{percentile(latencies, 0.99) * 1e6:>12.1f}')
+
+
+def count_nodes(tree):
+    """Return the number of nodes in the given PrefixTree or RadixTree,
+    including its root."""
+    count = 0
+    stack = [tree.root]
+    while len(stack) > 0:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children.values())
+    return count
+
+
+def main():
+    """Read command-line arguments and compare prefix tree node layouts and
+    build methods."""
+    args = sys.argv[1:]  # Ignore script file name
+    try:
+        count = int(args[0]) if len(args) >= 1 else 200000
+    except ValueError:
+        print('Integer required for `count` command-line argument')
+        return
+    compare_layouts(count)
+    print()
+    compare_node_sizes(count)
+    print()
+    compare_builds(count)
+    print()
+    compare_snapshots(count)
+
+
+if __name__ == '__main__':
+    main()
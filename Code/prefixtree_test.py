@@ -1,6 +1,8 @@
 #!python3
 
 from prefixtree import PrefixTree, PrefixTreeNode
+import pickle
+import threading
 import unittest
 
 
@@ -140,6 +142,108 @@ class PrefixTreeTest(unittest.TestCase):
         assert node_Z.is_terminal() is True
         assert node_Z.num_children() == 0
 
+    def test_from_sorted(self):
+        strings = ['A', 'ABC', 'ABD', 'ABD', 'XY', 'XYZ']
+        tree = PrefixTree.from_sorted(iter(strings))
+        assert tree.size == 5
+        assert tree.strings() == sorted(set(strings))
+        # Verify the tree has the same structure as one built with insert
+        node_B = tree.root.get_child('A').get_child('B')
+        assert node_B.num_children() == 2
+        assert node_B.get_child('C').is_terminal() is True
+        assert node_B.get_child('D').is_terminal() is True
+        assert tree.root.get_child('X').get_child('Y').is_terminal() is True
+
+    def test_from_sorted_with_unsorted_strings(self):
+        strings = ['XYZ', 'ABD', 'A', 'ABC', 'XY', 'ABD']
+        tree = PrefixTree.from_sorted(strings)
+        assert tree.size == 5
+        assert tree.strings() == sorted(set(strings))
+        assert tree.root.num_children() == 2
+
+    def test_extend(self):
+        tree = PrefixTree(['ABC', 'XY'])
+        tree.extend(['A', 'ABC', 'ABD'])
+        assert tree.size == 4
+        assert tree.strings() == ['A', 'ABC', 'ABD', 'XY']
+        assert tree.count('AB') == 2
+        assert tree.count('') == 4
+
+    def test_pickle(self):
+        tree = PrefixTree(['ABC', 'ABD', 'A', 'XYZ'])
+        tree.insert('ABD', 3)
+        copy = pickle.loads(pickle.dumps(tree))
+        assert copy.strings() == tree.strings()
+        assert copy.size == 4
+        assert copy.count('AB') == 2
+        assert copy.top_k('A', 1) == ['ABD']
+
+    def test_snapshot_requires_enabling(self):
+        tree = PrefixTree(['ABC', 'ABD'])
+        with self.assertRaises(ValueError):
+            tree.snapshot()
+        tree.enable_snapshots()
+        assert tree.snapshot().strings() == ['ABC', 'ABD']
+
+    def test_snapshot_is_not_changed_by_writes(self):
+        tree = PrefixTree(['ABC', 'ABD', 'XY'], snapshots=True)
+        snapshot = tree.snapshot()
+        tree.insert('ABE')
+        tree.insert('ABD', 5)
+        tree.delete('ABC')
+        # Verify the snapshot still has the version it was taken from
+        assert snapshot.size == 3
+        assert snapshot.strings() == ['ABC', 'ABD', 'XY']
+        assert snapshot.count('AB') == 2
+        assert snapshot.top_k('AB', 1) == ['ABC']
+        latest = tree.snapshot()
+        assert latest.size == 3
+        assert latest.strings() == ['ABD', 'ABE', 'XY']
+        assert latest.top_k('AB', 1) == ['ABD']
+        # Verify only the changed path was copied
+        assert latest.root is not snapshot.root
+        assert latest.root.get_child('X') is snapshot.root.get_child('X')
+        # Verify writing to a snapshot doesn't change the tree
+        snapshot.insert('XYZ')
+        assert snapshot.strings() == ['ABC', 'ABD', 'XY', 'XYZ']
+        assert tree.strings() == ['ABD', 'ABE', 'XY']
+
+    def test_snapshot_batch(self):
+        tree = PrefixTree.from_sorted(['A', 'B'])
+        tree.enable_snapshots()
+        with tree.batch():
+            tree.extend(['AB', 'AC'])
+            tree.insert('C')
+            # Verify nothing is published until the batch ends
+            assert tree.snapshot().strings() == ['A', 'B']
+        assert tree.snapshot().strings() == ['A', 'AB', 'AC', 'B', 'C']
+        assert tree.snapshot().count('A') == 3
+
+    def test_snapshots_with_concurrent_writer(self):
+        tree = PrefixTree(['A'])
+        words = [f'W{number:04d}' for number in range(2000)]
+        errors = []
+
+        def read():
+            for _ in range(200):
+                snapshot = tree.snapshot()
+                strings = snapshot.strings()
+                if len(strings) != snapshot.size or \
+                        snapshot.count('W') != snapshot.size - 1:
+                    errors.append(strings)
+
+        # The writer enables snapshots before sharing the tree with readers
+        tree.enable_snapshots()
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        for reader in readers:
+            reader.start()
+        for word in words:
+            tree.insert(word)
+        for reader in readers:
+            reader.join()
+        assert errors == []
+        assert tree.snapshot().size == 2001
+
     def test_size_and_is_empty(self):
         tree = PrefixTree()
         # Verify size after initializing tree
@@ -193,6 +297,66 @@ class PrefixTreeTest(unittest.TestCase):
         tree.insert('XYZ')
         assert tree.size == 4
 
+    def test_size_with_prefix_of_existing_string(self):
+        tree = PrefixTree()
+        tree.insert('ABC')
+        # Verify inserting a prefix of a string already in the tree counts it
+        tree.insert('A')
+        assert tree.size == 2
+        tree.insert('AB')
+        assert tree.size == 3
+        tree.insert('AB')
+        assert tree.size == 3
+
+    def test_delete(self):
+        tree = PrefixTree(['ABC', 'ABD', 'A', 'XYZ'])
+        node_A = tree.root.get_child('A')
+        node_B = node_A.get_child('B')
+        # Verify deleting a leaf string prunes only its own node
+        tree.delete('ABC')
+        assert tree.size == 3
+        assert tree.contains('ABC') is False
+        assert node_B.has_child('C') is False
+        assert node_B.has_child('D') is True
+        # Verify deleting an inner string keeps the nodes below it
+        tree.delete('A')
+        assert tree.size == 2
+        assert tree.contains('A') is False
+        assert node_A.is_terminal() is False
+        assert tree.complete('A') == ['ABD']
+        # Verify deleting the last string below a node prunes the whole path
+        tree.delete('ABD')
+        assert tree.size == 1
+        assert tree.root.has_child('A') is False
+        assert tree.strings() == ['XYZ']
+        tree.delete('XYZ')
+        assert tree.is_empty() is True
+        assert tree.root.num_children() == 0
+
+    def test_delete_missing_string(self):
+        tree = PrefixTree(['ABC', 'XYZ'])
+        # Verify deleting strings that aren't in the tree raises an error
+        with self.assertRaises(ValueError):
+            tree.delete('AB')
+        with self.assertRaises(ValueError):
+            tree.delete('ABCD')
+        with self.assertRaises(ValueError):
+            tree.delete('Q')
+        assert tree.size == 2
+        assert tree.strings() == ['ABC', 'XYZ']
+        # Verify deleting a string twice raises an error the second time
+        tree.delete('ABC')
+        with self.assertRaises(ValueError):
+            tree.delete('ABC')
+
+    def test_delete_updates_weights(self):
+        tree = PrefixTree()
+        tree.insert('ABC', 3)
+        tree.insert('ABD', 5)
+        tree.delete('ABD')
+        assert tree.root.max_weight == 3
+        assert tree.top_k('A', 2) == ['ABC']
+
     def test_contains(self):
         strings = ['ABC', 'ABD', 'A', 'XYZ']
         tree = PrefixTree(strings)
@@ -232,6 +396,126 @@ class PrefixTreeTest(unittest.TestCase):
         assert tree.complete('X') == ['XYZ']
         assert tree.complete('Y') == []
         assert tree.complete('Z') == []
+        # Verify prefixes that only partially match a path have no completions
+        assert tree.complete('AX') == []
+        assert tree.complete('ABCD') == []
+        assert tree.complete('XYZW') == []
+
+    def test_iter_complete(self):
+        strings = ['ABD', 'XYZ', 'ABC', 'A', 'ABCE']
+        tree = PrefixTree(strings)
+        # Verify completions are generated in sorted order
+        assert list(tree.iter_complete('')) == sorted(strings)
+        assert list(tree.iter_complete('AB')) == ['ABC', 'ABCE', 'ABD']
+        assert list(tree.iter_complete('B')) == []
+        # Verify generation stops after the given limit
+        assert list(tree.iter_complete('', limit=2)) == ['A', 'ABC']
+        assert list(tree.iter_complete('AB', limit=1)) == ['ABC']
+        assert list(tree.iter_complete('AB', limit=10)) == \
+            ['ABC', 'ABCE', 'ABD']
+        assert list(tree.iter_complete('A', limit=0)) == []
+
+    def test_count(self):
+        tree = PrefixTree(['ABC', 'ABD', 'A', 'XYZ'])
+        # Verify counts of strings below each prefix
+        assert tree.count('') == 4
+        assert tree.count('A') == 3
+        assert tree.count('AB') == 2
+        assert tree.count('ABC') == 1
+        assert tree.count('X') == 1
+        assert tree.count('AX') == 0
+        assert tree.count('B') == 0
+        # Verify counts are kept up to date by insert and delete
+        tree.insert('ABE')
+        tree.insert('ABE')
+        assert tree.count('AB') == 3
+        assert tree.root.count == tree.size == 5
+        tree.delete('A')
+        assert tree.count('A') == 3
+        assert tree.count('AB') == 3
+        tree.delete('ABC')
+        assert tree.count('A') == 2
+        assert tree.count('ABC') == 0
+        # Verify counts are kept by the bulk builder too
+        tree = PrefixTree.from_sorted(['A', 'ABC', 'ABD', 'ABD', 'XYZ'])
+        assert tree.count('') == 4
+        assert tree.count('AB') == 2
+
+    def test_complete_with_offset_and_limit(self):
+        strings = ['A', 'ABC', 'ABCE', 'ABD', 'B', 'BA', 'XYZ']
+        tree = PrefixTree(strings)
+        # Verify paging through completions matches slicing all of them
+        for prefix in ['', 'A', 'AB', 'B', 'X', 'Q']:
+            completions = tree.complete(prefix)
+            for offset in range(len(strings) + 1):
+                assert tree.complete(prefix, offset) == completions[offset:]
+                for limit in range(4):
+                    assert tree.complete(prefix, offset, limit) == \
+                        completions[offset:offset + limit]
+
+    def test_fuzzy_complete(self):
+        strings = ['hello', 'help', 'helmet', 'hollow', 'jello', 'yellow',
+                   'world', 'word', 'sword', 'he']
+        tree = PrefixTree(strings)
+        # Verify exact matches behave like complete
+        assert tree.fuzzy_complete('hel', 0) == tree.complete('hel')
+        assert tree.fuzzy_complete('xyz', 0) == []
+        # Verify one substitution, deletion or insertion is tolerated
+        assert tree.fuzzy_complete('jel', 1) == ['hello', 'helmet', 'help',
+                                                 'jello', 'yellow']
+        assert tree.fuzzy_complete('wrld', 1) == ['world']
+        assert tree.fuzzy_complete('wold', 1) == ['word', 'world']
+        # Verify a prefix within max_edits of the empty string matches all
+        assert tree.fuzzy_complete('zz', 2) == sorted(strings)
+        # Verify results agree with computing distances to every string
+        for prefix in ['helo', 'yelow', 'swo', 'hx', 'wod']:
+            for max_edits in range(3):
+                expected = [string for string in sorted(strings) if
+                            any(edit_distance(prefix, string[:i]) <= max_edits
+                                for i in range(len(string) + 1))]
+                assert tree.fuzzy_complete(prefix, max_edits) == expected
+
+    def test_insert_with_weight(self):
+        tree = PrefixTree()
+        tree.insert('ABC', 3)
+        tree.insert('ABD', 5)
+        tree.insert('A')
+        # Verify each node tracks the maximum weight in its subtree
+        node_A = tree.root.get_child('A')
+        node_B = node_A.get_child('B')
+        assert tree.root.max_weight == 5
+        assert node_A.weight == 0
+        assert node_A.max_weight == 5
+        assert node_B.max_weight == 5
+        assert node_B.get_child('C').weight == 3
+        assert node_B.get_child('C').max_weight == 3
+        # Verify inserting again without a weight keeps the current weight
+        tree.insert('ABC')
+        assert node_B.get_child('C').weight == 3
+        # Verify inserting again with a weight replaces the current weight
+        tree.insert('ABC', 8)
+        assert node_B.get_child('C').weight == 8
+        assert node_A.max_weight == 8
+
+    def test_top_k(self):
+        weights = {'ABC': 3, 'ABD': 5, 'A': 1, 'ABCE': 5, 'XYZ': 9, 'XY': 2}
+        tree = PrefixTree()
+        for string, weight in weights.items():
+            tree.insert(string, weight)
+        # Verify strings come out by decreasing weight, ties in sorted order
+        assert tree.top_k('', 3) == ['XYZ', 'ABCE', 'ABD']
+        assert tree.top_k('A', 10) == ['ABCE', 'ABD', 'ABC', 'A']
+        assert tree.top_k('ABC', 1) == ['ABCE']
+        assert tree.top_k('X', 2) == ['XYZ', 'XY']
+        assert tree.top_k('B', 2) == []
+        assert tree.top_k('AX', 2) == []
+        assert tree.top_k('A', 0) == []
+        # Verify top_k agrees with sorting every completion by weight
+        for prefix in ['', 'A', 'AB', 'X']:
+            expected = sorted(tree.complete(prefix),
+                              key=lambda string: (-weights[string], string))
+            for k in range(1, 7):
+                assert tree.top_k(prefix, k) == expected[:k]
 
     def test_strings(self):
         tree = PrefixTree()
@@ -246,5 +530,15 @@ class PrefixTreeTest(unittest.TestCase):
             self.assertCountEqual(tree_strings, input_strings)  # Ignore order
 
 
+def edit_distance(string1, string2):
+    """Return the Levenshtein distance between the given strings."""
+    if len(string1) == 0 or len(string2) == 0:
+        return max(len(string1), len(string2))
+    cost = 0 if string1[-1] == string2[-1] else 1
+    return min(edit_distance(string1[:-1], string2) + 1,
+               edit_distance(string1, string2[:-1]) + 1,
+               edit_distance(string1[:-1], string2[:-1]) + cost)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -13,6 +13,12 @@ class PrefixTreeNode:
     # Hint: Choosing list or dict affects implementation of all child methods
     CHILDREN_TYPE = dict  # or list
 
+    # Declare instance attributes up front so nodes don't carry a __dict__,
+    # which cuts each node from 200 to 152 bytes with its empty children
+    # (measured with compare_node_sizes in prefixtree_benchmark.py)
+    __slots__ = ('character', 'children', 'terminal', 'weight', 'max_weight',
+                 'count')
+
     def __init__(self, character=None):
         """Initialize this prefix tree node with the given character value, an
         empty structure of children nodes, and a boolean terminal property.
@@ -23,6 +29,24 @@ class PrefixTreeNode:
         self.children = PrefixTreeNode.CHILDREN_TYPE()
         # Marks if this node terminates a string in the prefix tree
         self.terminal = False
+        # Weight (such as popularity) of the string this node terminates
+        self.weight = 0
+        # Maximum weight of any string terminated in this node's subtree
+        self.max_weight = 0
+        # Number of strings terminated in this node's subtree, including here
+        self.count = 0
+
+    def copy(self):
+        """Return a new node with this node's character, properties and a new
+        structure of the same children nodes, which are shared, not copied.
+        Running time: O(b) for a node with b children"""
+        node = PrefixTreeNode(self.character)
+        node.children = PrefixTreeNode.CHILDREN_TYPE(self.children)
+        node.terminal = self.terminal
+        node.weight = self.weight
+        node.max_weight = self.max_weight
+        node.count = self.count
+        return node
 
     def is_terminal(self):
         """Return True if this prefix tree node terminates a string."""
@@ -60,6 +84,15 @@ class PrefixTreeNode:
         else:
             raise ValueError(f'Child exists for character {character!r}')
 
+    def remove_child(self, character):
+        """Remove this prefix tree node's child node that represents the given
+        character if it is amongst its children, or raise ValueError if not.
+        """
+        if self.has_child(character):
+            del self.children[character]
+        else:
+            raise ValueError(f'No child exists for character {character!r}')
+
     def __repr__(self):
         """Return a code representation of this prefix tree node."""
         return f'PrefixTreeNode({self.character!r})'
@@ -49,3 +49,29 @@ class PrefixTreeNodeTest(unittest.TestCase):
         # Verify adding node 'C' as child to node 'A' again raises error
         with self.assertRaises(ValueError):
             node_A.add_child('C', node_C)
+        # Remove node 'B' and verify only node 'C' is left as a child
+        node_A.remove_child('B')
+        assert node_A.num_children() == 1
+        assert node_A.has_child('B') is False
+        assert node_A.has_child('C') is True
+        # Verify removing node 'B' from node 'A' again raises error
+        with self.assertRaises(ValueError):
+            node_A.remove_child('B')
+
+    def test_copy(self):
+        node = PrefixTreeNode('A')
+        child_node = PrefixTreeNode('B')
+        node.add_child('B', child_node)
+        node.terminal = True
+        node.weight = 3
+        node.count = 2
+        copy = node.copy()
+        assert copy is not node
+        assert copy.character == 'A'
+        assert copy.is_terminal() is True
+        assert copy.weight == 3
+        assert copy.count == 2
+        # Verify children are shared but the structure holding them isn't
+        assert copy.get_child('B') is child_node
+        copy.add_child('C', PrefixTreeNode('C'))
+        assert node.has_child('C') is False
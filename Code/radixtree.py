@@ -0,0 +1,138 @@
+#!python3
+
+from prefixtreenode import PrefixTreeNode
+
+
+class RadixTree:
+    """RadixTree: A compressed prefix tree (aka radix tree or compact prefix
+    tree) with the same methods as PrefixTree, in which every node that would
+    be the only child of its parent is merged with its parent. Each node's
+    character property stores a fragment of one or more characters instead of
+    a single character, and its children are keyed by the first character of
+    their fragments. Long chains of single-child nodes (common with suffixes
+    like "-ation" or "-ness") collapse into one node, which cuts the number of
+    nodes and the number of dict lookups needed to walk down a path.
+    """
+
+    # Constant for the start character stored in the radix tree's root node
+    START_CHARACTER = ''
+
+    def __init__(self, strings=None):
+        """Initialize this radix tree and insert the given strings, if any."""
+        # Create a new root node with the start character
+        self.root = PrefixTreeNode(RadixTree.START_CHARACTER)
+        # Count the number of strings inserted into the tree
+        self.size = 0
+        # Insert each string, if any were given
+        if strings is not None:
+            for string in strings:
+                self.insert(string)
+
+    def __repr__(self):
+        """Return a string representation of this radix tree."""
+        return f'RadixTree({self.strings()!r})'
+
+    def is_empty(self):
+        """Return True if this radix tree is empty (contains no strings)."""
+        return self.size == 0
+
+    def contains(self, string):
+        """Return True if this radix tree contains the given string.
+        Running time: O(m) for a string of length m, but only one dict lookup
+        per node along its path instead of one per character"""
+        node, depth = self._find_node(string)
+        return depth == len(string) and node.is_terminal()
+
+    def insert(self, string):
+        """Insert the given string into this radix tree, splitting the fragment
+        of an existing node if the string diverges from it part way through.
+        Running time: O(m) for a string of length m"""
+        node, depth = self._find_node(string)
+        rest = string[depth:]
+        if len(rest) > 0:
+            child = node.children.get(rest[0], None)
+            if child is None:
+                # No fragment starts with this character, so add a new leaf
+                node = self._add_leaf(node, rest)
+            else:
+                # Split the child's fragment where it diverges from the string
+                common = self._common_prefix_length(child.character, rest)
+                middle = PrefixTreeNode(child.character[:common])
+                child.character = child.character[common:]
+                middle.add_child(child.character[0], child)
+                node.children[rest[0]] = middle
+                if common == len(rest):
+                    node = middle
+                else:
+                    node = self._add_leaf(middle, rest[common:])
+        # Only count the string if it wasn't already in the tree
+        if not node.is_terminal():
+            node.terminal = True
+            self.size += 1
+
+    def _add_leaf(self, node, fragment):
+        """Add a new child node storing the given fragment to the given node
+        and return the new child node."""
+        leaf = PrefixTreeNode(fragment)
+        node.add_child(fragment[0], leaf)
+        return leaf
+
+    @staticmethod
+    def _common_prefix_length(fragment, string):
+        """Return the number of leading characters the given strings share."""
+        length = 0
+        for char1, char2 in zip(fragment, string):
+            if char1 != char2:
+                break
+            length += 1
+        return length
+
+    def _find_node(self, string):
+        """Return a pair containing the deepest node in this radix tree whose
+        whole path matches a prefix of the given string and the node's depth.
+        The depth returned is equal to the number of prefix characters matched,
+        which is the total length of the fragments along the node's path.
+        """
+        node = self.root
+        depth = 0
+        while depth < len(string):
+            child = node.children.get(string[depth], None)
+            # Stop if no fragment starts with the next character or if the
+            # string doesn't contain the child's whole fragment
+            if child is None or not string.startswith(child.character, depth):
+                break
+            node = child
+            depth += len(child.character)
+        return node, depth
+
+    def complete(self, prefix):
+        """Return a list of all strings stored in this radix tree that start
+        with the given prefix string, in sorted order."""
+        completions = []
+        node, depth = self._find_node(prefix)
+        rest = prefix[depth:]
+        if len(rest) > 0:
+            # The prefix may end part way through a child's fragment
+            child = node.children.get(rest[0], None)
+            if child is None or not child.character.startswith(rest):
+                return completions
+            node = child
+            depth += len(child.character)
+        # Fragments along the path from the root to the current node
+        path = [prefix[:depth - len(node.character)]]
+        # Stack of nodes to visit, paired with their depth in the path
+        stack = [(node, 1)]
+        while len(stack) > 0:
+            node, depth = stack.pop()
+            del path[depth:]
+            path.append(node.character)
+            if node.is_terminal():
+                completions.append(''.join(path))
+            # Push children in reverse order so they are popped in order
+            for key in sorted(node.children, reverse=True):
+                stack.append((node.children[key], depth + 1))
+        return completions
+
+    def strings(self):
+        """Return a list of all strings stored in this radix tree."""
+        return self.complete('')
@@ -0,0 +1,83 @@
+#!python3
+
+from radixtree import RadixTree
+from prefixtree import PrefixTree
+import unittest
+
+
+class RadixTreeTest(unittest.TestCase):
+
+    def test_init_and_properties(self):
+        tree = RadixTree()
+        assert tree.size == 0
+        assert tree.is_empty() is True
+        assert tree.root.character == RadixTree.START_CHARACTER
+        assert tree.root.num_children() == 0
+
+    def test_insert_stores_fragments(self):
+        tree = RadixTree(['ABC'])
+        # A single string is stored as one fragment
+        assert tree.root.num_children() == 1
+        node_ABC = tree.root.get_child('A')
+        assert node_ABC.character == 'ABC'
+        assert node_ABC.is_terminal() is True
+        # Diverging string splits the fragment into 'AB' with children 'C', 'D'
+        tree.insert('ABD')
+        node_AB = tree.root.get_child('A')
+        assert node_AB.character == 'AB'
+        assert node_AB.is_terminal() is False
+        assert node_AB.num_children() == 2
+        assert node_AB.get_child('C') is node_ABC
+        assert node_ABC.character == 'C'
+        assert node_AB.get_child('D').character == 'D'
+        # Prefix of an existing fragment splits it and becomes terminal
+        tree.insert('A')
+        node_A = tree.root.get_child('A')
+        assert node_A.character == 'A'
+        assert node_A.is_terminal() is True
+        assert node_A.get_child('B') is node_AB
+        assert node_AB.character == 'B'
+        assert tree.size == 3
+
+    def test_size_with_repeated_insert(self):
+        tree = RadixTree()
+        for string in ['ABC', 'ABC', 'A', 'ABD', 'A', 'XYZ']:
+            tree.insert(string)
+        assert tree.size == 4
+        assert tree.is_empty() is False
+
+    def test_contains(self):
+        tree = RadixTree(['ABC', 'ABD', 'A', 'XYZ'])
+        assert tree.contains('ABC') is True
+        assert tree.contains('ABD') is True
+        assert tree.contains('A') is True
+        assert tree.contains('XYZ') is True
+        assert tree.contains('AB') is False
+        assert tree.contains('XY') is False
+        assert tree.contains('XYZW') is False
+        assert tree.contains('B') is False
+
+    def test_complete(self):
+        tree = RadixTree(['ABC', 'ABD', 'A', 'XYZ'])
+        assert tree.complete('ABC') == ['ABC']
+        assert tree.complete('AB') == ['ABC', 'ABD']
+        assert tree.complete('A') == ['A', 'ABC', 'ABD']
+        # Prefixes ending part way through a fragment
+        assert tree.complete('X') == ['XYZ']
+        assert tree.complete('XY') == ['XYZ']
+        assert tree.complete('XZ') == []
+        assert tree.complete('B') == []
+        assert tree.complete('') == ['A', 'ABC', 'ABD', 'XYZ']
+
+    def test_matches_prefix_tree(self):
+        strings = ['nation', 'national', 'nationalization', 'nations',
+                   'notion', 'kindness', 'kind', 'kindly', 'ration']
+        radix_tree = RadixTree(strings)
+        tree = PrefixTree(strings)
+        assert radix_tree.strings() == sorted(strings)
+        for prefix in ['n', 'na', 'nation', 'nationa', 'k', 'kindn', 'r']:
+            assert radix_tree.complete(prefix) == tree.complete(prefix)
+
+
+if __name__ == '__main__':
+    unittest.main()
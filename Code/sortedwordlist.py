@@ -0,0 +1,206 @@
+#!python3
+
+from bisect import bisect_left
+import sys
+
+
+class SortedWordList:
+    """SortedWordList: A sorted list of unique strings with the same methods
+    as PrefixTree. Because strings that start with a given prefix are next to
+    each other in sorted order, completions of a prefix are found by binary
+    searching for the range of strings they occupy and slicing that range.
+    This uses far less memory than a prefix tree, at the cost of O(n) time to
+    insert a string in the middle of the list.
+    """
+
+    def __init__(self, strings=None, table_length=0):
+        """Initialize this list with the given strings in sorted order, if any
+        were given, skipping duplicates. If `table_length` is positive, also
+        keep a table of the range of every prefix up to that length, so the
+        ranges of short prefixes, which match the most strings and are the
+        most often requested, are found with one dict lookup."""
+        self.words = sorted(set(strings)) if strings is not None else []
+        self.table_length = table_length
+        # Range [start, end) of each prefix up to table_length characters
+        self.table = {}
+        self._build_table()
+
+    def __repr__(self):
+        """Return a string representation of this sorted word list."""
+        return f'SortedWordList({self.words!r})'
+
+    @property
+    def size(self):
+        """Return the number of strings in this sorted word list."""
+        return len(self.words)
+
+    def is_empty(self):
+        """Return True if this sorted word list contains no strings."""
+        return len(self.words) == 0
+
+    def contains(self, string):
+        """Return True if this sorted word list contains the given string.
+        Running time: O(m*log n) for a string of length m"""
+        index = bisect_left(self.words, string)
+        return index < len(self.words) and self.words[index] == string
+
+    def _build_table(self):
+        """Fill the prefix range table from the sorted words in one pass,
+        extending the range of each prefix of a word that the word before it
+        shares, or else starting a new range.
+        Running time: O(n*k) for a table of prefixes up to length k"""
+        self.table = {}
+        if self.table_length <= 0:
+            return
+        table = self.table
+        for index, word in enumerate(self.words):
+            for length in range(1, min(self.table_length, len(word)) + 1):
+                prefix = word[:length]
+                start, end = table.get(prefix, (index, index))
+                table[prefix] = (start, index + 1)
+        table[''] = (0, len(self.words))
+
+    def _update_table(self, string, index):
+        """Update the prefix range table after inserting the given string at
+        the given index, widening the ranges of its short prefixes, shifting
+        the ranges after it and adding ranges of its new short prefixes.
+        Running time: O(t) for a table with t prefixes"""
+        prefixes = set(string[:length] for length in
+                       range(min(self.table_length, len(string)) + 1))
+        for prefix, (start, end) in self.table.items():
+            if prefix in prefixes:
+                self.table[prefix] = (start, end + 1)
+            elif start >= index:
+                self.table[prefix] = (start + 1, end + 1)
+        for prefix in prefixes:
+            if prefix not in self.table:
+                self.table[prefix] = (index, index + 1)
+
+    def _extend_table(self, new_words):
+        """Update the prefix range table after merging the given sorted new
+        strings into the list. Each range moves later by the number of new
+        strings before its prefix and grows by the number of new strings
+        that start with it, and prefixes of only new strings are added.
+        Running time: O(t*log s + s*k) for s new strings and a table with t
+        prefixes up to length k"""
+        # Count the new strings that start with each of their short prefixes
+        added = {}
+        for string in new_words:
+            for length in range(min(self.table_length, len(string)) + 1):
+                prefix = string[:length]
+                added[prefix] = added.get(prefix, 0) + 1
+        for prefix, (start, end) in self.table.items():
+            # New strings less than the prefix come before its range
+            shift = bisect_left(new_words, prefix)
+            self.table[prefix] = (start + shift,
+                                  end + shift + added.pop(prefix, 0))
+        for prefix, count in added.items():
+            start = bisect_left(self.words, prefix)
+            self.table[prefix] = (start, start + count)
+
+    def table_nbytes(self):
+        """Return the number of bytes used by the prefix range table,
+        counting the dict, its keys, range tuples and their integers."""
+        if len(self.table) == 0:
+            return 0
+        return sys.getsizeof(self.table) + sum(
+            sys.getsizeof(prefix) + sys.getsizeof(bounds) +
+            sys.getsizeof(bounds[0]) + sys.getsizeof(bounds[1])
+            for prefix, bounds in self.table.items())
+
+    def insert(self, string):
+        """Insert the given string into this sorted word list, if it isn't
+        already in it, keeping the list and prefix range table up to date.
+        Running time: O(n + t) to shift the strings and t table ranges after
+        it"""
+        index = bisect_left(self.words, string)
+        if index < len(self.words) and self.words[index] == string:
+            return
+        self.words.insert(index, string)
+        if self.table_length > 0:
+            self._update_table(string, index)
+
+    def extend(self, strings):
+        """Insert the given strings, which may be any iterable, into this
+        sorted word list, skipping any already in it. New strings are added
+        at the end and the list is sorted once, which merges the two sorted
+        runs instead of shifting the list for each string, and only the
+        prefix range table's existing ranges are updated, so loading a
+        vocabulary in chunks doesn't rebuild the table for every chunk.
+        Running time: O(n + s*log s + t*log s) to add s strings to a list
+        with a table of t prefixes"""
+        new_words = set(strings)
+        new_words.difference_update(self.words)
+        if len(new_words) > 0:
+            new_words = sorted(new_words)
+            self.words.extend(new_words)
+            self.words.sort()
+            if self.table_length > 0:
+                self._extend_table(new_words)
+
+    def prefix_range(self, prefix, low=0, high=None):
+        """Return a pair of indexes [start, end) of the range of strings that
+        start with the given prefix, searching only within range [low, high),
+        which must contain the whole range if given.
+        Running time: O(1) for a prefix up to the table's length, or else
+        O(m*log n) for a prefix of length m"""
+        if 0 < self.table_length and len(prefix) <= self.table_length:
+            # Every word's short prefixes are in the table, so a missing
+            # prefix starts no words
+            bounds = self.table.get(prefix, None)
+            if bounds is None:
+                return low, low
+            return bounds
+        if high is None:
+            high = len(self.words)
+        start = bisect_left(self.words, prefix, low, high)
+        if len(prefix) == 0:
+            return start, high
+        # Every string after the range is at least the prefix with its last
+        # character replaced by the next character
+        last = ord(prefix[-1])
+        if last == 0x10FFFF:
+            # No next character exists, so scan to the end of the range
+            end = start
+            while end < high and self.words[end].startswith(prefix):
+                end += 1
+            return start, end
+        upper = prefix[:-1] + chr(last + 1)
+        return start, bisect_left(self.words, upper, start, high)
+
+    def count(self, prefix):
+        """Return the number of strings that start with the given prefix.
+        Running time: O(1) for a prefix up to the table's length, or else
+        O(m*log n)"""
+        start, end = self.prefix_range(prefix)
+        return end - start
+
+    def complete(self, prefix):
+        """Return a list of all strings in this sorted word list that start
+        with the given prefix string, in sorted order.
+        Running time: O(m*log n + k) to find k strings"""
+        start, end = self.prefix_range(prefix)
+        return self.words[start:end]
+
+    def complete_batch(self, prefixes):
+        """Return a list of the lists of strings that start with each of the
+        given prefixes, in the same order as the prefixes. Prefixes are
+        resolved in sorted order, so each one binary searches only within the
+        range already found for the longest earlier prefix it extends."""
+        completions = {}
+        # Stack of resolved prefixes, each extending the one below it,
+        # paired with their ranges
+        stack = [('', 0, len(self.words))]
+        for prefix in sorted(set(prefixes)):
+            # Find the longest resolved prefix that this prefix extends
+            while not prefix.startswith(stack[-1][0]):
+                stack.pop()
+            start, end = self.prefix_range(prefix, stack[-1][1], stack[-1][2])
+            completions[prefix] = (start, end)
+            stack.append((prefix, start, end))
+        return [self.words[start:end] for start, end in
+                (completions[prefix] for prefix in prefixes)]
+
+    def strings(self):
+        """Return a list of all strings in this sorted word list."""
+        return list(self.words)
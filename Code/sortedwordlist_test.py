@@ -0,0 +1,85 @@
+#!python3
+
+from sortedwordlist import SortedWordList
+import unittest
+
+
+VOCABULARY = ['axle', 'axled', 'axlesmith', 'axletree', 'axe', 'ax',
+              'banana', 'band', 'bandana', 'can', 'cane', 'Axe']
+PREFIXES = ['', 'a', 'ax', 'axl', 'axle', 'axles', 'b', 'ban', 'band',
+            'c', 'cat', 'A', 'z']
+
+
+class SortedWordListTest(unittest.TestCase):
+
+    def test_init_and_insert(self):
+        words = SortedWordList(['band', 'ax', 'band', 'can'])
+        assert words.size == 3
+        assert words.strings() == ['ax', 'band', 'can']
+        words.insert('bandana')
+        words.insert('ax')
+        assert words.size == 4
+        assert words.strings() == ['ax', 'band', 'bandana', 'can']
+        assert words.contains('bandana') is True
+        assert words.contains('ban') is False
+
+    def test_extend(self):
+        words = SortedWordList(['band', 'ax'])
+        words.extend(iter(['can', 'ax', 'bandana', 'can']))
+        assert words.strings() == ['ax', 'band', 'bandana', 'can']
+        words.extend([])
+        assert words.size == 4
+
+    def test_prefix_range(self):
+        words = SortedWordList(['ax', 'axe', 'axle', 'b', 'ba', 'c'])
+        assert words.prefix_range('') == (0, 6)
+        assert words.prefix_range('ax') == (0, 3)
+        assert words.prefix_range('axl') == (2, 3)
+        assert words.prefix_range('b') == (3, 5)
+        assert words.prefix_range('bb') == (5, 5)
+        # Verify searching within a range of a shorter prefix
+        assert words.prefix_range('axe', 0, 3) == (1, 2)
+        # Verify prefixes ending with the largest character
+        words.insert('c\U0010ffff')
+        words.insert('c\U0010ffffz')
+        assert words.complete('c\U0010ffff') == ['c\U0010ffff', 'c\U0010ffffz']
+
+    def test_prefix_table(self):
+        words = SortedWordList(VOCABULARY, table_length=2)
+        assert words.table[''] == (0, 12)
+        assert words.table['ax'] == words.prefix_range('ax') == (1, 7)
+        assert words.table['b'] == (7, 10)
+        assert 'axl' not in words.table
+        # Verify short prefixes missing from the table match nothing
+        assert 'zq' not in words.table
+        start, end = words.prefix_range('zq')
+        assert start == end and words.complete('zq') == []
+        assert words.count('q') == 0
+        assert words.table_nbytes() > 0
+        assert SortedWordList(VOCABULARY).table_nbytes() == 0
+        for prefix in PREFIXES:
+            assert words.complete(prefix) == sorted(
+                word for word in VOCABULARY if word.startswith(prefix))
+            assert words.count(prefix) == len(words.complete(prefix))
+
+    def test_prefix_table_after_insert(self):
+        words = SortedWordList(VOCABULARY, table_length=2)
+        for word in ['ba', 'a', 'zebra', 'aardvark', '', 'Axe', 'cab']:
+            words.insert(word)
+            # Verify the table matches one built from scratch
+            rebuilt = SortedWordList(words.strings(), table_length=2)
+            assert words.table == rebuilt.table
+        words.extend(['bb', 'c'])
+        assert words.table == SortedWordList(words.strings(), 2).table
+
+    def test_prefix_table_after_extend_in_chunks(self):
+        words = SortedWordList(VOCABULARY[:3], table_length=2)
+        for start in range(3, len(VOCABULARY), 3):
+            words.extend(VOCABULARY[start:start + 3] + ['zz', 'Ax'])
+            # Verify the table matches one built from scratch
+            rebuilt = SortedWordList(words.strings(), table_length=2)
+            assert words.table == rebuilt.table
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!python3
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import sys
+import time
+
+from sorting_parallel import parallel_merge_sort
+from sorting_recursive import merge_sort, bottom_up_merge_sort, quick_sort, \
+    tim_sort
+
+
+def sorted_ints(count, seed=0):
+    """Return a list of the integers from 0 to `count` in sorted order."""
+    return list(range(count))
+
+
+def reversed_ints(count, seed=0):
+    """Return a list of the integers from 0 to `count` in reverse order."""
+    return list(range(count, 0, -1))
+
+
+def nearly_sorted_ints(count, seed=0, fraction=0.01):
+    """Return a list of the integers from 0 to `count` in sorted order, except
+    that the given fraction of them arrive late, moved to a later position
+    like late arrivals in a batch of log records."""
+    rng = random.Random(seed)
+    items = list(range(count))
+    for _ in range(int(count * fraction)):
+        index = rng.randrange(count)
+        items.insert(min(count, index + rng.randrange(1, 100)),
+                     items.pop(index))
+    return items
+
+
+def random_ints(count, seed=0):
+    """Return a list of `count` random integers in range [0...`count`)."""
+    rng = random.Random(seed)
+    return [rng.randrange(count) for _ in range(count)]
+
+
+def few_unique_ints(count, seed=0, unique=10):
+    """Return a list of `count` random integers in range [0...`unique`), so
+    each value is repeated many times."""
+    rng = random.Random(seed)
+    return [rng.randrange(unique) for _ in range(count)]
+
+
+# Kinds of input to benchmark sorts with, by name
+INPUTS = {
+    'sorted': sorted_ints,
+    'reversed': reversed_ints,
+    'nearly sorted': nearly_sorted_ints,
+    'random': random_ints,
+    'few unique': few_unique_ints,
+}
+
+# Sorting functions to benchmark, each of which sorts a list in place
+SORTS = [merge_sort, bottom_up_merge_sort, quick_sort, tim_sort]
+
+
+def measure_sort(sort, items, repeat=3):
+    """Return the best time in seconds to sort a copy of the given items with
+    the given sort function over the given number of runs, the name of the
+    error it raised, such as RecursionError, or 'incorrect' if it didn't
+    sort them."""
+    expected = sorted(items)
+    best = float('inf')
+    for _ in range(repeat):
+        copy = list(items)
+        start_time = time.perf_counter()
+        try:
+            sort(copy)
+        except RecursionError as error:
+            return type(error).__name__
+        best = min(best, time.perf_counter() - start_time)
+        if copy != expected:
+            return 'incorrect'
+    return best
+
+
+def compare_sorts(count=100000, sorts=SORTS, inputs=INPUTS, repeat=3,
+                  seed=0):
+    """Print the best time of each of the given sorts on each of the given
+    kinds of input of the given number of integers, and of the built-in
+    list.sort method for reference."""
+    print(f'Sorting {count} integers, best of {repeat} runs (sec)')
+    print()
+    names = [sort.__name__ for sort in sorts] + ['list.sort']
+    print(f'{"input":<16}' + ''.join(f'{name:>22}' for name in names))
+    for input_name, generate in inputs.items():
+        items = generate(count, seed)
+        timings = [measure_sort(sort, items, repeat) for sort in sorts]
+        timings.append(measure_sort(list.sort, items, repeat))
+        print(f'{input_name:<16}' + ''.join(
+            f'{timing:>22.4f}' if isinstance(timing, float)
+            else f'{timing:>22}' for timing in timings))
+
+
+def compare_workers(count=1000000, worker_counts=None, repeat=3, seed=0):
+    """Print the best time of parallel_merge_sort on random integers with
+    each of the given numbers of workers (default: powers of 2 up to the
+    number of CPUs), using a pool started before timing, and its speedup
+    over bottom_up_merge_sort in this process. Workers can only speed it up
+    on as many CPUs, so fewer CPUs than workers are flagged."""
+    cpus = os.cpu_count() or 1
+    if worker_counts is None:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cpus:
+            worker_counts.append(worker_counts[-1] * 2)
+    items = random_ints(count, seed)
+    print(f'Sorting {count} integers on {cpus} CPUs, best of {repeat} runs')
+    print()
+    print(f'{"workers":>8}{"sec":>12}{"speedup":>12}')
+    baseline = measure_sort(bottom_up_merge_sort, items, repeat)
+    print(f'{"serial":>8}{baseline:>12.4f}{1:>12.2f}')
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Start the worker processes before timing
+            list(pool.map(abs, range(workers)))
+            timing = measure_sort(
+                lambda items: parallel_merge_sort(items, workers, pool),
+                items, repeat)
+        note = '  (more workers than CPUs)' if workers > cpus else ''
+        print(f'{workers:>8}{timing:>12.4f}{baseline / timing:>12.2f}{note}')
+
+
+def main():
+    """Read command-line arguments and compare sorting algorithms, or the
+    parallel merge sort's numbers of workers if 'parallel' is given."""
+    args = sys.argv[1:]  # Ignore script file name
+    try:
+        count = int(args[0]) if len(args) >= 1 else 100000
+    except ValueError:
+        print('Integer required for `count` command-line argument')
+        return
+    if len(args) >= 2 and args[1] == 'parallel':
+        worker_counts = [int(arg) for arg in args[2:]] or None
+        compare_workers(count, worker_counts)
+    else:
+        compare_sorts(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!python3
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from sorting_recursive import merge_iterables, tim_sort
+
+
+# Default number of bytes of items to sort in memory at once
+MEMORY = 64 << 20
+
+# Default number of run files to merge at once
+FAN_IN = 16
+
+# Estimated bytes per item beyond the item itself: its reference in the
+# list being sorted, plus room for the sort's buffer of references
+ITEM_OVERHEAD = 16
+
+
+def read_chunks(lines, memory=MEMORY, parse=None):
+    """Generate lists of items parsed from the given lines, one item per line
+    without its line break, each list holding as many items as fit in the
+    given number of bytes (at least one)."""
+    chunk = []
+    size = 0
+    for line in lines:
+        item = line.rstrip('\n')
+        if parse is not None:
+            item = parse(item)
+        chunk.append(item)
+        size += sys.getsizeof(item) + ITEM_OVERHEAD
+        if size >= memory:
+            yield chunk
+            chunk = []
+            size = 0
+    if len(chunk) > 0:
+        yield chunk
+
+
+def read_run(filename, buffer_size, parse=None):
+    """Generate the items in the given run file, one per line, reading it
+    through a buffer of the given number of bytes."""
+    with open(filename, encoding='utf-8', buffering=buffer_size) as file:
+        for line in file:
+            item = line[:-1]
+            yield item if parse is None else parse(item)
+
+
+def write_run(filename, items, buffer_size=-1):
+    """Write the given items to the given file, one per line."""
+    with open(filename, 'w', encoding='utf-8', buffering=buffer_size) as file:
+        for item in items:
+            file.write(f'{item}\n')
+
+
+def external_sort(input_filename, output_filename, memory=MEMORY,
+                  fan_in=FAN_IN, parse=None, sort=tim_sort, temp_dir=None):
+    """Sort the lines of the given input file, which may be larger than
+    memory, into the given output file. Chunks of lines that fit in `memory`
+    bytes are parsed with `parse` (default: kept as strings), sorted with the
+    given sort function and written to temporary run files. Runs are then
+    merged `fan_in` at a time, streaming each through a buffer so the buffers
+    fit in `memory` bytes, until one merge writes the output file. Temporary
+    files are removed afterward, even if sorting fails. Equal items keep their
+    order if the sort function is stable, since runs are merged in order.
+    Return the number of runs the input was sorted into.
+    Running time: O(n log(n)) comparisons, plus reading and writing all items
+        once per merge pass, with O(log(n/m) / log(f)) passes for a memory
+        budget of m items and a fan-in of f
+    Memory usage: O(m) for one chunk while sorting, and O(f) buffers totaling
+        `memory` bytes while merging
+    """
+    if fan_in < 2:
+        raise ValueError(f'fan_in must be at least 2: {fan_in}')
+    directory = tempfile.mkdtemp(prefix='external-sort-', dir=temp_dir)
+    try:
+        # Sort chunks that fit in memory into run files
+        runs = []
+        with open(input_filename, encoding='utf-8') as file:
+            for chunk in read_chunks(file, memory, parse):
+                sort(chunk)
+                runs.append(os.path.join(directory, f'run-{len(runs)}'))
+                write_run(runs[-1], chunk)
+                del chunk
+        run_count = len(runs)
+        # Each merge reads up to fan_in runs and writes one run
+        buffer_size = max(4096, memory // (fan_in + 1))
+        merges = 0
+        while len(runs) > fan_in:
+            merged_runs = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                if len(group) == 1:
+                    merged_runs.extend(group)
+                    continue
+                merged_runs.append(os.path.join(directory,
+                                                f'merge-{merges}'))
+                merges += 1
+                _merge_runs(group, merged_runs[-1], buffer_size, parse)
+            runs = merged_runs
+        _merge_runs(runs, output_filename, buffer_size, parse)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return run_count
+
+
+def _merge_runs(runs, output_filename, buffer_size, parse):
+    """Merge the given run files into the given output file, reading and
+    writing each through a buffer of the given number of bytes, and remove
+    the run files."""
+    readers = [read_run(run, buffer_size, parse) for run in runs]
+    write_run(output_filename, merge_iterables(readers), buffer_size)
+    for run in runs:
+        os.remove(run)
+
+
+def parse_args(args):
+    """Return the command-line options parsed from the given arguments."""
+    parser = argparse.ArgumentParser(
+        description='Sort the lines of a file that may not fit in memory')
+    parser.add_argument('input', help='file to sort, one item per line')
+    parser.add_argument('output', help='file to write sorted items to')
+    parser.add_argument('-m', '--memory', type=int, default=MEMORY,
+                        metavar='BYTES', help='bytes of items to sort in '
+                                              f'memory (default: {MEMORY})')
+    parser.add_argument('-f', '--fan-in', type=int, default=FAN_IN,
+                        help=f'runs to merge at once (default: {FAN_IN})')
+    parser.add_argument('-n', '--numeric', action='store_true',
+                        help='sort lines as integers instead of strings')
+    parser.add_argument('--temp-dir', metavar='DIR',
+                        help='directory for run files (default: system '
+                             'temporary directory)')
+    return parser.parse_args(args)
+
+
+def main():
+    """Read command-line arguments and sort a file."""
+    options = parse_args(sys.argv[1:])
+    runs = external_sort(options.input, options.output, options.memory,
+                         options.fan_in, int if options.numeric else None,
+                         temp_dir=options.temp_dir)
+    print(f'Sorted {options.input} into {options.output} from {runs} runs')
+
+
+if __name__ == '__main__':
+    main()
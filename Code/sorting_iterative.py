@@ -1,5 +1,7 @@
 #!python
 
+from bisect import bisect_right
+
 
 def is_sorted(items):
     """Return a boolean indicating whether given items are in sorted order.
@@ -74,3 +76,27 @@ def insertion_sort(items):
             items[j], items[j - 1] = items[j - 1], items[j]
             j -= 1
     return items
+
+
+def binary_insertion_sort(items, low=0, high=None, start=None):
+    """Sort given items in range `[low...high)` in place by taking each
+    unsorted item and inserting it among the sorted items before it at the
+    position found by binary search, after any items equal to it so equal
+    items keep their order. If `start` is given, items in `[low...start)`
+    must already be in sorted order.
+    Running time: O(n log n) comparisons, but O(n**2) moves in the worst case,
+        which are fast as they're done by slice assignment
+    Memory usage: O(1) Sorting is done in place, only ints declared
+    """
+    if high is None:
+        high = len(items)
+    if start is None or start <= low:
+        start = low + 1
+    for i in range(start, high):
+        item = items[i]
+        # Find the position after all sorted items not greater than this one
+        position = bisect_right(items, item, low, i)
+        # Shift the greater items right by one and put this item before them
+        items[position + 1:i + 1] = items[position:i]
+        items[position] = item
+    return items
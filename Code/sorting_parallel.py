@@ -0,0 +1,57 @@
+#!python3
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from sorting_recursive import merge, merge_iterables, bottom_up_merge_sort
+
+
+# Number of items below which sorting in this process is faster than
+# sending them to worker processes
+PARALLEL_LENGTH = 10000
+
+
+def chunk_bounds(length, count):
+    """Return a list of `count` pairs of indexes [low, high) splitting a list
+    of the given length into ranges of nearly equal length."""
+    return [(length * index // count, length * (index + 1) // count)
+            for index in range(count)]
+
+
+def _sort_chunk(items):
+    """Return the given list of items sorted, in a worker process."""
+    return bottom_up_merge_sort(items)
+
+
+def parallel_merge_sort(items, workers=None, pool=None):
+    """Sort given items in place by splitting them into one chunk per worker,
+    sorting each chunk with bottom-up merge sort in a pool of worker
+    processes, and merging the sorted chunks in this process. Chunks are
+    pickled to the workers and back, which costs far less than sorting them
+    (about 0.05 sec per million integers). If a pool such as a
+    ProcessPoolExecutor is given, it's used instead of starting a new one,
+    so repeated sorts don't pay to start processes each time. `workers` is
+    the number of chunks (default: one per CPU). Equal items keep their
+    order (it's stable).
+    Running time: O((n/p) log(n/p)) with p workers on p cores to sort the
+        chunks, plus O(n log(p)) to merge them in this process, so it's
+        slower than bottom_up_merge_sort on a single core
+    Memory usage: O(n) for the chunks, the sorted chunks and the merged list
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(items) < PARALLEL_LENGTH:
+        return bottom_up_merge_sort(items)
+    chunks = (items[low:high] for low, high in chunk_bounds(len(items),
+                                                             workers))
+    if pool is not None:
+        runs = list(pool.map(_sort_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            runs = list(pool.map(_sort_chunk, chunks))
+    # Merge the sorted chunks back into the given list
+    if len(runs) == 2:
+        items[:] = merge(runs[0], runs[1])
+    else:
+        items[:] = merge_iterables(runs)
+    return items
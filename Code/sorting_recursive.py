@@ -1,5 +1,24 @@
 #!python
 
+from bisect import bisect_left, bisect_right
+
+from binaryheap import BinaryMinHeap
+from sorting_iterative import binary_insertion_sort
+
+
+# Length of the runs that bottom-up merge sort sorts with insertion sort
+# before it starts merging, which saves the first few merging passes
+BOTTOM_UP_RUN = 32
+
+# Length of the ranges that quick sort sorts with insertion sort instead of
+# partitioning, and above which it picks pivots from nine items, not three
+INSERTION_LENGTH = 16
+NINTHER_LENGTH = 40
+
+# Number of items in a row taken from the same run of a merge before it
+# switches to galloping, which copies items from one run in bulk
+MIN_GALLOP = 7
+
 
 def merge(items1, items2):
     """Merge given lists of items, each assumed to already be in sorted order,
@@ -11,8 +30,9 @@ def merge(items1, items2):
     new_list = []
     # Repeat until one list is empty
     while ind_1 <= len(items1) - 1 and ind_2 <= len(items2) - 1:
-        # Find minimum item in both lists and append it to new list
-        if items1[ind_1] <= items2[ind_2]:
+        # Find minimum item in both lists and append it to new list,
+        # taking the first list's item if they're equal so it's stable
+        if not items2[ind_2] < items1[ind_1]:
             new_list.append(items1[ind_1])
             ind_1 += 1
         else:
@@ -26,6 +46,54 @@ def merge(items1, items2):
     return new_list
 
 
+class _MergeEntry(object):
+    """Next item of one of the iterables in merge_iterables, ordered by its
+    item and then by its iterable's index. Only < is used to compare items,
+    so items that define nothing else (such as records sorted by a key)
+    still fall back to the index when they're equal."""
+
+    __slots__ = ('item', 'index')
+
+    def __init__(self, item, index):
+        self.item = item
+        self.index = index
+
+    def __lt__(self, other):
+        if self.item < other.item:
+            return True
+        if other.item < self.item:
+            return False
+        return self.index < other.index
+
+
+def merge_iterables(iterables):
+    """Generate all items of the given iterables, each assumed to already be
+    in sorted order, in sorted order, reading each one lazily. A min heap
+    holds the next item of each iterable, paired with the iterable's index
+    so equal items come out in the order of their iterables (it's stable).
+    Running time: O(n log(k)) for n items in k iterables
+    Memory usage: O(k) One item from each iterable in the heap
+    """
+    iterators = [iter(iterable) for iterable in iterables]
+    if len(iterators) == 1:
+        yield from iterators[0]
+        return
+    heap = BinaryMinHeap()
+    for index, iterator in enumerate(iterators):
+        for item in iterator:
+            heap.insert(_MergeEntry(item, index))
+            break
+    while not heap.is_empty():
+        entry = heap.get_min()
+        yield entry.item
+        # Replace the item with the next one from its iterable, if any
+        for next_item in iterators[entry.index]:
+            heap.replace_min(_MergeEntry(next_item, entry.index))
+            break
+        else:
+            heap.delete_min()
+
+
 def split_sort_merge(items):
     """Sort given items by splitting list into two approximately equal halves,
     sorting each with an iterative sorting algorithm, and merging results into
@@ -57,60 +125,397 @@ def merge_sort(items):
     return items
 
 
+def merge_ranges(source, target, low, middle, high):
+    """Merge the sorted ranges `[low...middle-1]` and `[middle...high-1]` of
+    the source list into range `[low...high-1]` of the target list, taking
+    from the left range first when items are equal so the merge is stable.
+    Running time: O(n) Passes over each element of the ranges once
+    Memory usage: O(1) Writes into the existing target list
+    """
+    left, right = low, middle
+    for index in range(low, high):
+        # Take the smaller first item of the two ranges, or whatever is left
+        if right >= high or (left < middle and
+                             not source[right] < source[left]):
+            target[index] = source[left]
+            left += 1
+        else:
+            target[index] = source[right]
+            right += 1
+
+
+def bottom_up_merge_sort(items):
+    """Sort given items in place by sorting short runs with insertion sort,
+    then merging neighboring runs of doubling width in passes that move all
+    items back and forth between the list and one auxiliary buffer. Unlike
+    merge_sort, it doesn't recurse or make new lists while merging, and
+    equal items keep their order (it's stable).
+    Running time: O(n log(n)) Passes over each element log(n/32) times
+    Memory usage: O(n) One buffer the same length as the list
+    """
+    length = len(items)
+    if length < 2:
+        return items
+    # Sort runs of a fixed length in place
+    for low in range(0, length, BOTTOM_UP_RUN):
+        binary_insertion_sort(items, low, min(low + BOTTOM_UP_RUN, length))
+    source, target = items, [None] * length
+    width = BOTTOM_UP_RUN
+    while width < length:
+        # Merge each pair of neighboring runs into the other list
+        for low in range(0, length, 2 * width):
+            middle = min(low + width, length)
+            high = min(low + 2 * width, length)
+            if middle == high:
+                # No run to merge with, so copy this one across
+                for index in range(low, high):
+                    target[index] = source[index]
+            else:
+                merge_ranges(source, target, low, middle, high)
+        source, target = target, source
+        width *= 2
+    # Copy the result back if the last pass left it in the buffer
+    if source is not items:
+        items[:] = source
+    return items
+
+
 def partition(items, low, high):
     """Return index `p` after in-place partitioning given items in range
     `[low...high]` by choosing a pivot (The last item) from
     that range, moving pivot into index `p`, items less than pivot into range
-    `[low...p-1]`, and items greater than pivot into range `[p+1...high]`.
+    `[low...p-1]`, and items greater than or equal to pivot into range
+    `[p+1...high]`.
     Running time: O(n) as it loops over each element once
     Memory usage: O(1) as it declares a constant number of variables
     """
     # Last item is pivot
     pivot = items[high]
+    # Items in range [low...p-1] are less than the pivot
+    p = low
+    for i in range(low, high):
+        # Move each smaller item to the end of the smaller range
+        if items[i] < pivot:
+            items[i], items[p] = items[p], items[i]
+            p += 1
+    # Put pivot into the right place
+    items[p], items[high] = items[high], items[p]
+    return p
 
-    i = low  # Left counter
-    j = high - 1  # Right counter
 
-    # Loop until left meets right
-    while i < j:
-        # Count down until finding a smaller item
-        if items[j] >= pivot:
-            j -= 1
-        # Count up until finding a larger item
+def three_way_partition(items, low, high, pivot):
+    """Return indexes `(lt, gt)` after in-place partitioning given items in
+    range `[low...high]` around the given pivot value (Dutch national flag),
+    moving items less than pivot into range `[low...lt-1]`, items equal to
+    pivot into range `[lt...gt]`, and items greater than pivot into range
+    `[gt+1...high]`, so items equal to pivot are never sorted again.
+    Running time: O(n) as it loops over each element once
+    Memory usage: O(1) as it declares a constant number of variables
+    """
+    lt, i, gt = low, low, high
+    # Items in [lt...i-1] equal pivot and items in [i...gt] are unchecked
+    while i <= gt:
         if items[i] < pivot:
+            items[lt], items[i] = items[i], items[lt]
+            lt += 1
             i += 1
-        # If two items are in the wrong place, switch them
-        if items[i] >= pivot and items[j] < pivot:
-            items[i], items[j] = items[j], items[i]
-            j -= 1
+        elif pivot < items[i]:
+            items[i], items[gt] = items[gt], items[i]
+            gt -= 1
+        else:
             i += 1
+    return lt, gt
+
+
+def _median_of_three(items, a, b, c):
+    """Return whichever of the given indexes holds the median of their
+    items."""
+    if items[a] < items[b]:
+        if items[b] < items[c]:
+            return b
+        return c if items[a] < items[c] else a
+    if items[a] < items[c]:
+        return a
+    return c if items[b] < items[c] else b
 
-    # Put pivot into the right place
-    if items[i] < pivot:
-        i += 1
-    items[i], items[high] = items[high], items[i]
-    return i
+
+def choose_pivot(items, low, high):
+    """Return a pivot value for items in range `[low...high]`: the median of
+    the first, middle and last items, or for ranges of more than
+    NINTHER_LENGTH items the median of the medians of three evenly spaced
+    groups of three (Tukey's ninther), so presorted items split evenly."""
+    middle = (low + high) // 2
+    if high - low + 1 > NINTHER_LENGTH:
+        step = (high - low + 1) // 8
+        first = _median_of_three(items, low, low + step, low + 2 * step)
+        middle = _median_of_three(items, middle - step, middle,
+                                  middle + step)
+        last = _median_of_three(items, high - 2 * step, high - step, high)
+        return items[_median_of_three(items, first, middle, last)]
+    return items[_median_of_three(items, low, middle, high)]
+
+
+def heap_sort(items, low=0, high=None):
+    """Sort given items in place in range `[low...high]` by arranging them
+    into a max heap and repeatedly swapping its maximum item to the end.
+    Running time: O(n log(n)) in every case, as each item sifts down at most
+        log(n) levels
+    Memory usage: O(1) as the heap is stored in the range itself
+    """
+    if high is None:
+        high = len(items) - 1
+    length = high - low + 1
+    # Sift down every item with children, from the last one to the root
+    for root in range(length // 2 - 1, -1, -1):
+        _sift_down(items, low, root, length)
+    # Swap the maximum to the end of the heap and shrink the heap
+    for end in range(length - 1, 0, -1):
+        items[low], items[low + end] = items[low + end], items[low]
+        _sift_down(items, low, 0, end)
+    return items
+
+
+def _sift_down(items, low, root, length):
+    """Move the item at heap index `root` down the max heap of `length`
+    items stored from index `low` until it's not less than its children."""
+    item = items[low + root]
+    child = 2 * root + 1
+    while child < length:
+        # Pick the larger child
+        if child + 1 < length and items[low + child] < items[low + child + 1]:
+            child += 1
+        if not item < items[low + child]:
+            break
+        # Move the child up into the hole and continue from its place
+        items[low + root] = items[low + child]
+        root = child
+        child = 2 * root + 1
+    items[low + root] = item
 
 
 def quick_sort(items, low=None, high=None):
     """Sort given items in place by partitioning items in range `[low...high]`
-    around a pivot item and recursively sorting each remaining sublist range.
-    Best case running time: O(1) if list is only one element
-    Worst case running time: O(n**2) if it's in reverse sorted order, as each
-                             recursion only splits one element off
-    Memory usage: O(log n) As each recursion defines set variables
+    into items less than, equal to and greater than a pivot item, sorting the
+    smaller of the less and greater ranges recursively and the larger one in
+    a loop, and sorting ranges of at most INSERTION_LENGTH items with
+    insertion sort (introsort). If the ranges split unevenly too many times,
+    it falls back to heap sort.
+    Best case running time: O(n) if all items are equal, as one partition
+        finds them all
+    Worst case running time: O(n log(n)) as pivots are medians of samples
+        and heap sort takes over after 2*log(n) uneven splits
+    Memory usage: O(log n) As it only recurses on the smaller range
     """
     # Check if high and low range bounds have default values (not given)
-    if low is None and high is None:
+    if low is None:
         low = 0
+    if high is None:
         high = len(items) - 1
-    # Check if list or range is so small it's already sorted (base case)
-    if len(items[low:high + 1]) == 1:
-        return items
     if low < high:
-        # Partition items in-place around a pivot and get index of pivot
-        p = partition(items, low, high)
+        _intro_sort(items, low, high, 2 * (high - low + 1).bit_length())
+    return items
+
+
+def _intro_sort(items, low, high, depth_limit):
+    """Sort given items in place in range `[low...high]` with quick sort,
+    switching to heap sort once `depth_limit` partitions deep."""
+    # Check if range is small enough for insertion sort (base case)
+    while high - low + 1 > INSERTION_LENGTH:
+        if depth_limit == 0:
+            heap_sort(items, low, high)
+            return
+        depth_limit -= 1
+        # Partition items in-place around a pivot
+        lt, gt = three_way_partition(items, low, high,
+                                     choose_pivot(items, low, high))
+        # Sort the smaller range recursively and the larger one in this loop
+        if lt - low < high - gt:
+            _intro_sort(items, low, lt - 1, depth_limit)
+            low = gt + 1
+        else:
+            _intro_sort(items, gt + 1, high, depth_limit)
+            high = lt - 1
+    binary_insertion_sort(items, low, high + 1)
 
-        # Sort each sublist range by recursively calling quick sort
-        quick_sort(items, low, p - 1)
-        quick_sort(items, p + 1, high)
+
+def tim_sort(items):
+    """Sort given items in place by finding runs of items already in order,
+    reversing strictly descending runs, extending short runs to a minimum
+    length with binary insertion sort, and merging runs of similar lengths
+    from a stack of pending runs, galloping through runs that win many
+    comparisons in a row. Equal items keep their order (it's stable).
+    Running time: O(n) if items are already in order or reverse order, as
+        there is only one run, up to O(n log n) for random items, as runs are
+        merged in a balanced way
+    Memory usage: O(n) for a copy of the left run of each merge
+    """
+    length = len(items)
+    if length < 2:
+        return items
+    min_run = _min_run_length(length)
+    # Stack of pending runs as (start index, length) pairs
+    runs = []
+    low = 0
+    while low < length:
+        run_length = _count_run(items, low, length)
+        # Extend a short run with binary insertion sort
+        if run_length < min_run:
+            forced_length = min(min_run, length - low)
+            binary_insertion_sort(items, low, low + forced_length,
+                                  low + run_length)
+            run_length = forced_length
+        runs.append((low, run_length))
+        _merge_collapse(items, runs)
+        low += run_length
+    # Merge all remaining runs, from the top of the stack down
+    while len(runs) > 1:
+        index = len(runs) - 2
+        if index > 0 and runs[index - 1][1] < runs[index + 1][1]:
+            index -= 1
+        _merge_at(items, runs, index)
+    return items
+
+
+def _min_run_length(length):
+    """Return the minimum run length for sorting the given number of items,
+    between 32 and 64 for 64 items or more, chosen so the number of runs is
+    a power of two or slightly less, which keeps the final merges balanced.
+    """
+    # Take the top 6 bits of the length, adding 1 if any other bit is set
+    remainder = 0
+    while length >= 64:
+        remainder |= length & 1
+        length >>= 1
+    return length + remainder
+
+
+def _count_run(items, low, high):
+    """Return the length of the run of items starting at index `low` and
+    ending before `high` that is in ascending order, or in strictly descending
+    order, which is reversed in place (strictly, so it stays stable)."""
+    run_high = low + 1
+    if run_high == high:
+        return 1
+    if items[run_high] < items[low]:
+        # Descending run
+        while run_high + 1 < high and items[run_high + 1] < items[run_high]:
+            run_high += 1
+        run_high += 1
+        items[low:run_high] = items[low:run_high][::-1]
+    else:
+        # Ascending run
+        while run_high + 1 < high and \
+                not items[run_high + 1] < items[run_high]:
+            run_high += 1
+        run_high += 1
+    return run_high - low
+
+
+def _merge_collapse(items, runs):
+    """Merge runs at the top of the given stack of runs until the lengths of
+    the top three runs A, B and C (with C on top) satisfy A > B + C and
+    B > C, so lengths shrink at least as fast as Fibonacci numbers down the
+    stack, which keeps it short and merges runs of similar lengths."""
+    while len(runs) > 1:
+        index = len(runs) - 2
+        if (index > 0 and runs[index - 1][1] <=
+                runs[index][1] + runs[index + 1][1]) or \
+                (index > 1 and runs[index - 2][1] <=
+                 runs[index - 1][1] + runs[index][1]):
+            # Merge the middle run with the shorter of its neighbors
+            if runs[index - 1][1] < runs[index + 1][1]:
+                index -= 1
+        elif runs[index][1] > runs[index + 1][1]:
+            break
+        _merge_at(items, runs, index)
+
+
+def _merge_at(items, runs, index):
+    """Merge the runs at the given index and the next index of the given
+    stack of runs, which are next to each other in the given items."""
+    start, length1 = runs[index]
+    length2 = runs[index + 1][1]
+    _merge_runs(items, start, start + length1, start + length1 + length2)
+    runs[index] = (start, length1 + length2)
+    del runs[index + 1]
+
+
+def _gallop_left(key, items, start, end):
+    """Return the index of the first item in sorted range `[start...end)` of
+    the given items that is not less than the given key, checking indexes 1,
+    3, 7, 15... past the start before binary searching, so an index k places
+    past the start is found in O(log k) time."""
+    bound = 1
+    while start + bound <= end and items[start + bound - 1] < key:
+        bound *= 2
+    return bisect_left(items, key, start + bound // 2,
+                       min(start + bound, end))
+
+
+def _gallop_right(key, items, start, end):
+    """Return the index of the first item in sorted range `[start...end)` of
+    the given items that is greater than the given key, the same way as
+    _gallop_left."""
+    bound = 1
+    while start + bound <= end and not key < items[start + bound - 1]:
+        bound *= 2
+    return bisect_right(items, key, start + bound // 2,
+                        min(start + bound, end))
+
+
+def _merge_runs(items, low, middle, high):
+    """Merge sorted ranges `[low...middle)` and `[middle...high)` of given
+    items in place, keeping equal items in order. Items at the start of the
+    left run and the end of the right run that are already in place are
+    skipped, and once one run supplies MIN_GALLOP items in a row, items are
+    copied in bulk from each run in turn until neither supplies that many.
+    Running time: O(n) comparisons for n items in both runs, or
+        O(log n) if the runs barely overlap
+    Memory usage: O(n) for a copy of the left run
+    """
+    # Left items not greater than the first right item are already in place
+    low = _gallop_right(items[middle], items, low, middle)
+    if low == middle:
+        return
+    # Right items not less than the last left item are already in place
+    high = bisect_left(items, items[middle - 1], middle, high)
+    left = items[low:middle]
+    left_end = len(left)
+    # Index of the next left item, next right item and next merged item
+    i, j, k = 0, middle, low
+    while i < left_end and j < high:
+        # Take one item at a time until one run wins many times in a row
+        left_wins = right_wins = 0
+        while i < left_end and j < high:
+            if items[j] < left[i]:
+                items[k] = items[j]
+                j += 1
+                right_wins += 1
+                left_wins = 0
+            else:
+                items[k] = left[i]
+                i += 1
+                left_wins += 1
+                right_wins = 0
+            k += 1
+            if left_wins >= MIN_GALLOP or right_wins >= MIN_GALLOP:
+                break
+        # Gallop: copy all left items not greater than the next right item,
+        # then all right items less than the next left item, while it pays
+        while i < left_end and j < high:
+            end = _gallop_right(items[j], left, i, left_end)
+            num_left = end - i
+            items[k:k + num_left] = left[i:end]
+            k += num_left
+            i = end
+            if i == left_end:
+                break
+            end = _gallop_left(left[i], items, j, high)
+            num_right = end - j
+            items[k:k + num_right] = items[j:end]
+            k += num_right
+            j = end
+            if num_left < MIN_GALLOP and num_right < MIN_GALLOP:
+                break
+    # Copy the remaining left items, as remaining right items are in place
+    items[k:k + left_end - i] = left[i:]
@@ -2,8 +2,17 @@
 
 from sorting import random_ints
 from sorting_iterative import is_sorted, bubble_sort, selection_sort, insertion_sort
+from sorting_iterative import binary_insertion_sort
 from sorting_recursive import split_sort_merge, merge_sort, quick_sort
+from sorting_recursive import bottom_up_merge_sort, merge_ranges, tim_sort
+from sorting_recursive import partition, three_way_partition, heap_sort
+from sorting_recursive import merge_iterables
+from sorting_parallel import parallel_merge_sort, chunk_bounds
+from sorting_external import external_sort, read_chunks
 from sorting_integer import counting_sort, bucket_sort
+from concurrent.futures import ProcessPoolExecutor
+import os
+import tempfile
 import unittest
 
 
@@ -186,6 +195,305 @@ class StringSortTest(unittest.TestCase):
         assert items == sorted_items
 
 
+class Record:
+    """Item that compares only by its key, to test stability."""
+
+    def __init__(self, key, order):
+        self.key = key
+        self.order = order
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+# Small lists, with and without duplicates, that every sort must handle
+SMALL_LISTS = ([], [3], [5, 3], [5, 7, 3], [3, 3], [5, 5, 3, 5, 3])
+
+
+def check_sorts_small_lists(sort):
+    """Assert the given sort function sorts each of SMALL_LISTS."""
+    for items in SMALL_LISTS:
+        items = list(items)  # Copy so the next sort gets the original
+        sorted_items = sorted(items)
+        sort(items)  # Mutate
+        assert items == sorted_items
+
+
+def check_sort_is_stable(sort, count=3000):
+    """Assert the given sort function keeps items with equal keys in their
+    original order, sorting `count` records with many repeated keys."""
+    keys = random_ints(count * 2 // 3, 1, 20) + \
+        list(range(count // 6, 0, -1)) * 2
+    items = [Record(key, order) for order, key in enumerate(keys)]
+    sort(items)
+    pairs = [(item.key, item.order) for item in items]
+    # Items with equal keys stay in their original order
+    assert pairs == sorted(pairs)
+
+
+def parallel_merge_sort_3(items):
+    """Sort given items with parallel_merge_sort and 3 workers."""
+    return parallel_merge_sort(items, 3)
+
+
+class SortFunctionsTest(unittest.TestCase):
+
+    def test_sorts_on_small_lists(self):
+        for sort_function in (tim_sort, bottom_up_merge_sort, quick_sort,
+                              heap_sort, parallel_merge_sort_3):
+            with self.subTest(sort=sort_function.__name__):
+                check_sorts_small_lists(sort_function)
+
+    def test_stable_sorts_are_stable(self):
+        for sort_function in (tim_sort, bottom_up_merge_sort):
+            with self.subTest(sort=sort_function.__name__):
+                check_sort_is_stable(sort_function)
+        # Enough records to be sorted in worker processes, merging 2 runs
+        # with merge and 3 runs with merge_iterables
+        check_sort_is_stable(lambda items: parallel_merge_sort(items, 2),
+                             30000)
+        check_sort_is_stable(parallel_merge_sort_3, 30000)
+
+
+class TimSortTest(unittest.TestCase):
+
+    def test_binary_insertion_sort_on_ranges(self):
+        items = [9, 8, 5, 3, 7, 1, 0]
+        binary_insertion_sort(items, 1, 6)
+        assert items == [9, 1, 3, 5, 7, 8, 0]  # Only [1, 6) is sorted
+        items = [1, 4, 6, 5, 2, 3]
+        binary_insertion_sort(items, 0, 6, 3)  # [0, 3) is already sorted
+        assert items == [1, 2, 3, 4, 5, 6]
+
+    def test_tim_sort_on_presorted_lists(self):
+        for count in (10, 63, 64, 65, 1000, 5000):
+            items = list(range(count))
+            tim_sort(items)
+            assert items == list(range(count))
+            items = list(range(count, 0, -1))
+            tim_sort(items)
+            assert items == list(range(1, count + 1))
+            # Sorted runs with a few items out of place between them
+            items = list(range(count)) + list(range(count // 2))
+            items[count // 3], items[-1] = items[-1], items[count // 3]
+            sorted_items = sorted(items)
+            tim_sort(items)
+            assert items == sorted_items
+
+    def test_tim_sort_on_lists_of_random_integers_with_duplicates(self):
+        for count, maximum in ((20, 10), (100, 30), (1000, 50), (5000, 5000)):
+            items = random_ints(count, 1, maximum)
+            sorted_items = sorted(items)  # Copy
+            tim_sort(items)  # Mutate
+            assert items == sorted_items
+
+    def test_tim_sort_on_strings(self):
+        items = 'one fish two fish red fish blue fish'.split()
+        sorted_items = sorted(items)
+        tim_sort(items)
+        assert items == sorted_items
+
+
+class BottomUpMergeSortTest(unittest.TestCase):
+
+    def test_merge_ranges(self):
+        source = [9, 1, 4, 6, 2, 4, 5, 0]
+        target = [None] * len(source)
+        merge_ranges(source, target, 1, 4, 7)
+        assert target[1:7] == [1, 2, 4, 4, 5, 6]
+        assert target[0] is None and target[7] is None  # Outside the ranges
+
+    def test_bottom_up_merge_sort_on_many_lengths(self):
+        # Lengths around run and pass boundaries, odd numbers of runs, and
+        # lists large enough to overflow the stack of a recursive sort
+        for count in (31, 32, 33, 64, 65, 95, 100, 1000, 4097, 20000):
+            for maximum in (3, count):
+                items = random_ints(count, 1, maximum)
+                sorted_items = sorted(items)  # Copy
+                bottom_up_merge_sort(items)  # Mutate
+                assert items == sorted_items
+            items = list(range(count, 0, -1))
+            bottom_up_merge_sort(items)
+            assert items == list(range(1, count + 1))
+
+    def test_bottom_up_merge_sort_on_strings(self):
+        items = 'Doc Grumpy Happy Sleepy Bashful Sneezy Dopey'.split()
+        sorted_items = sorted(items)
+        bottom_up_merge_sort(items)
+        assert items == sorted_items
+
+
+class QuickSortTest(unittest.TestCase):
+
+    def test_partition(self):
+        items = [5, 9, 1, 7, 3, 5, 6]
+        p = partition(items, 0, 6)
+        assert items[p] == 6  # Pivot was the last item
+        assert all(item < 6 for item in items[:p])
+        assert all(item >= 6 for item in items[p + 1:])
+        items = [5, 3, 5, 1, 5]
+        p = partition(items, 0, 4)
+        assert items[p] == 5 and sorted(items[:p]) == [1, 3]
+        assert items[p + 1:] == [5, 5]  # Items equal to pivot go right
+
+    def test_three_way_partition(self):
+        items = [5, 3, 5, 9, 1, 5, 7, 5]
+        lt, gt = three_way_partition(items, 0, 7, 5)
+        assert sorted(items[:lt]) == [1, 3]
+        assert items[lt:gt + 1] == [5, 5, 5, 5]
+        assert sorted(items[gt + 1:]) == [7, 9]
+
+    def test_heap_sort(self):
+        for count, maximum in ((0, 1), (1, 1), (10, 3), (100, 30), (777, 777)):
+            items = random_ints(count, 1, maximum)
+            sorted_items = sorted(items)  # Copy
+            heap_sort(items)  # Mutate
+            assert items == sorted_items
+        items = [9, 8, 5, 3, 7, 1, 0]
+        heap_sort(items, 1, 5)
+        assert items == [9, 1, 3, 5, 7, 8, 0]  # Only [1...5] is sorted
+
+    def test_quick_sort_on_range(self):
+        items = [9, 8, 5, 3, 7, 1, 0]
+        quick_sort(items, 1, 5)
+        assert items == [9, 1, 3, 5, 7, 8, 0]  # Only [1...5] is sorted
+
+    def test_quick_sort_on_presorted_lists(self):
+        # Pivoting on the last item made these quadratic and deeply recursive
+        for count in (10, 17, 100, 5000, 50000):
+            items = list(range(count))
+            quick_sort(items)
+            assert items == list(range(count))
+            items = list(range(count, 0, -1))
+            quick_sort(items)
+            assert items == list(range(1, count + 1))
+            # Organ pipe: ascending then descending
+            items = list(range(count // 2)) + list(range(count // 2, 0, -1))
+            sorted_items = sorted(items)
+            quick_sort(items)
+            assert items == sorted_items
+
+    def test_quick_sort_on_lists_with_many_duplicates(self):
+        for count, maximum in ((20, 1), (100, 2), (1000, 3), (5000, 10),
+                               (5000, 5000)):
+            items = random_ints(count, 1, maximum)
+            sorted_items = sorted(items)  # Copy
+            quick_sort(items)  # Mutate
+            assert items == sorted_items
+
+    def test_quick_sort_on_strings(self):
+        items = 'one fish two fish red fish blue fish'.split() * 5
+        sorted_items = sorted(items)
+        quick_sort(items)
+        assert items == sorted_items
+
+
+class ParallelMergeSortTest(unittest.TestCase):
+
+    def test_merge_iterables(self):
+        assert list(merge_iterables([])) == []
+        assert list(merge_iterables([[1, 4]])) == [1, 4]
+        runs = [[1, 4, 9], [], [2, 3, 10, 11], [0, 4]]
+        assert list(merge_iterables(runs)) == [0, 1, 2, 3, 4, 4, 9, 10, 11]
+        # Iterables are read lazily, so generators work
+        runs = [iter(range(0, 10, 2)), iter(range(1, 10, 2))]
+        assert list(merge_iterables(runs)) == list(range(10))
+
+    def test_chunk_bounds(self):
+        assert chunk_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+        assert chunk_bounds(2, 3) == [(0, 0), (0, 1), (1, 2)]
+
+    def test_parallel_merge_sort_on_integers_and_floats(self):
+        for workers in (2, 3):
+            items = random_ints(20000, -1000, 1000)
+            sorted_items = sorted(items)  # Copy
+            parallel_merge_sort(items, workers)  # Mutate
+            assert items == sorted_items
+            items = [item / 7 for item in random_ints(20000, 1, 1000)]
+            sorted_items = sorted(items)
+            parallel_merge_sort(items, workers)
+            assert items == sorted_items
+
+    def test_parallel_merge_sort_with_given_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            for count in (20000, 30001):
+                items = random_ints(count, 1, 1000)
+                sorted_items = sorted(items)
+                parallel_merge_sort(items, 4, pool)  # More chunks than workers
+                assert items == sorted_items
+
+    def test_parallel_merge_sort_on_strings(self):
+        items = [str(item) for item in random_ints(20000, 1, 5000)]
+        sorted_items = sorted(items)
+        parallel_merge_sort(items, 3)
+        assert items == sorted_items
+
+
+class ExternalSortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.directory.name, 'input.txt')
+        self.output = os.path.join(self.directory.name, 'output.txt')
+        # Run files are written here so tests can check they're removed
+        self.temp_dir = os.path.join(self.directory.name, 'temp')
+        os.mkdir(self.temp_dir)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_input(self, items):
+        with open(self.input, 'w', encoding='utf-8') as file:
+            file.write(''.join(f'{item}\n' for item in items))
+
+    def read_output(self):
+        with open(self.output, encoding='utf-8') as file:
+            return file.read().splitlines()
+
+    def test_read_chunks(self):
+        lines = [f'{item}\n' for item in range(10)]
+        chunks = list(read_chunks(lines, 1, int))
+        assert chunks == [[item] for item in range(10)]  # One item each
+        chunks = list(read_chunks(lines, 10 ** 6))
+        assert chunks == [[str(item) for item in range(10)]]  # One chunk
+
+    def test_external_sort_on_strings(self):
+        items = 'Doc Grumpy Happy Sleepy Bashful Sneezy Dopey'.split() * 20
+        self.write_input(items)
+        runs = external_sort(self.input, self.output, memory=500, fan_in=2,
+                             temp_dir=self.temp_dir)
+        assert runs > 2  # Needs more than one merge pass
+        assert self.read_output() == sorted(items)
+        assert os.listdir(self.temp_dir) == []  # Run files were removed
+
+    def test_external_sort_on_integers(self):
+        items = random_ints(5000, -1000, 1000)
+        self.write_input(items)
+        for memory, fan_in in ((2000, 2), (2000, 3), (20000, 16),
+                               (10 ** 7, 4)):
+            runs = external_sort(self.input, self.output, memory, fan_in,
+                                 parse=int, sort=quick_sort,
+                                 temp_dir=self.temp_dir)
+            assert runs >= 1
+            assert [int(line) for line in self.read_output()] == sorted(items)
+            assert os.listdir(self.temp_dir) == []
+
+    def test_external_sort_on_empty_file(self):
+        self.write_input([])
+        assert external_sort(self.input, self.output,
+                             temp_dir=self.temp_dir) == 0
+        assert self.read_output() == []
+
+    def test_external_sort_removes_run_files_on_error(self):
+        self.write_input(['1', '2', 'three'])
+        with self.assertRaises(ValueError):
+            external_sort(self.input, self.output, parse=int,
+                          temp_dir=self.temp_dir)
+        assert os.listdir(self.temp_dir) == []
+        with self.assertRaises(ValueError):
+            external_sort(self.input, self.output, fan_in=1)
+
+
 def get_sort_function():
     """Read command-line argument and return sort function with that name."""
     import sys
@@ -0,0 +1,238 @@
+#!python3
+
+from array import array
+from bisect import bisect_left
+import sys
+
+from prefixbatch import complete_batch
+
+
+class SuffixArray:
+    """SuffixArray: An index of every substring of a list of words. The words
+    are joined into one text, each preceded by a separator, and the starting
+    positions of all suffixes of that text are stored in sorted order of the
+    suffixes, so the suffixes that start with any given fragment are next to
+    each other and can be found by binary search. An LCP array stores the
+    length of the longest common prefix of each pair of neighboring suffixes,
+    so the rest of a fragment's range is found without comparing strings.
+    Completing a prefix searches for the separator followed by the prefix,
+    which only matches at the start of a word.
+    """
+
+    # Character joining the words, which lines of a file never contain
+    SEPARATOR = '\n'
+
+    def __init__(self, strings=None):
+        """Initialize this suffix array with the given strings in sorted
+        order, if any were given, skipping duplicates and strings containing
+        the separator."""
+        self.words = sorted(set(string for string in strings or ()
+                                if SuffixArray.SEPARATOR not in string))
+        # Index of the word each position of the text is in, counting each
+        # word's separator as part of it
+        self.word_indexes = array('i')
+        for index, word in enumerate(self.words):
+            self.word_indexes.extend(array('i', [index]) * (len(word) + 1))
+        self.text = ''.join(SuffixArray.SEPARATOR + word
+                            for word in self.words)
+        self.suffixes = build_suffix_array(self.text)
+        self.lcp = build_lcp_array(self.text, self.suffixes)
+
+    def __repr__(self):
+        """Return a string representation of this suffix array."""
+        return f'SuffixArray({self.words!r})'
+
+    @property
+    def size(self):
+        """Return the number of strings in this suffix array."""
+        return len(self.words)
+
+    def is_empty(self):
+        """Return True if this suffix array contains no strings."""
+        return len(self.words) == 0
+
+    def nbytes(self):
+        """Return the number of bytes used by the text and index arrays,
+        not counting the list of words."""
+        return (sys.getsizeof(self.text) +
+                sum(column.itemsize * len(column) for column in
+                    (self.word_indexes, self.suffixes, self.lcp)))
+
+    def _lower_bound(self, fragment):
+        """Return the index of the first suffix in sorted order that is not
+        less than the given fragment.
+        Running time: O(m*log n) for a fragment of length m"""
+        text, suffixes, length = self.text, self.suffixes, len(fragment)
+        low, high = 0, len(suffixes)
+        while low < high:
+            middle = (low + high) // 2
+            start = suffixes[middle]
+            if text[start:start + length] < fragment:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _upper_bound(self, fragment, low=0):
+        """Return the index of the first suffix in sorted order after the
+        given index that does not start with and is greater than the given
+        fragment.
+        Running time: O(m*log n) for a fragment of length m"""
+        text, suffixes, length = self.text, self.suffixes, len(fragment)
+        high = len(suffixes)
+        while low < high:
+            middle = (low + high) // 2
+            start = suffixes[middle]
+            if text[start:start + length] <= fragment:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _range(self, fragment):
+        """Return a pair of indexes [start, end) of the range of suffixes in
+        sorted order that start with the given fragment.
+        Running time: O(m*log n) for a fragment of length m"""
+        start = self._lower_bound(fragment)
+        return start, self._upper_bound(fragment, start)
+
+    def _occurrences(self, fragment):
+        """Generate the position in the text of each occurrence of the given
+        fragment in sorted order of their suffixes, finding the first by
+        binary search and the rest lazily by reading the LCP array, since each
+        suffix after the first that shares at least the fragment's length with
+        the suffix before it also starts with the fragment.
+        Running time: O(m*log n) to find the first occurrence, then O(1) each
+        """
+        index = self._lower_bound(fragment)
+        suffixes, lcp, length = self.suffixes, self.lcp, len(fragment)
+        if index == len(suffixes):
+            return
+        start = suffixes[index]
+        if self.text[start:start + length] != fragment:
+            return
+        yield start
+        index += 1
+        while index < len(suffixes) and lcp[index] >= length:
+            yield suffixes[index]
+            index += 1
+
+    def search(self, fragment, limit=None):
+        """Return a list of all distinct strings in this suffix array that
+        contain the given fragment, in sorted order. If a limit is given,
+        return only the first that many strings found, reading only as many
+        occurrences as it takes to find them.
+        Running time: O(m*log n + k*log k) for k occurrences"""
+        if SuffixArray.SEPARATOR in fragment:
+            return []
+        if limit is not None:
+            indexes = set()
+            for position in self._occurrences(fragment):
+                if len(indexes) >= limit:
+                    break
+                indexes.add(self.word_indexes[position])
+            return [self.words[index] for index in sorted(indexes)]
+        if len(fragment) == 0:
+            return list(self.words)
+        start, end = self._range(fragment)
+        # Map each occurrence to its word, skipping repeats within a word
+        indexes = set(map(self.word_indexes.__getitem__,
+                          self.suffixes[start:end]))
+        return [self.words[index] for index in sorted(indexes)]
+
+    def contains(self, string):
+        """Return True if this suffix array contains the given whole string.
+        Running time: O(m*log w) for a string of length m in w words"""
+        index = bisect_left(self.words, string)
+        return index < len(self.words) and self.words[index] == string
+
+    def count(self, prefix):
+        """Return the number of strings that start with the given prefix.
+        Running time: O(m*log n) for a prefix of length m"""
+        if SuffixArray.SEPARATOR in prefix:
+            return 0
+        start, end = self._range(SuffixArray.SEPARATOR + prefix)
+        return end - start
+
+    def complete(self, prefix):
+        """Return a list of all strings in this suffix array that start with
+        the given prefix string, in sorted order. Each occurrence of the
+        separator followed by the prefix is the start of a different word.
+        Running time: O(m*log n + k*log k) to find k strings"""
+        if SuffixArray.SEPARATOR in prefix:
+            return []
+        start, end = self._range(SuffixArray.SEPARATOR + prefix)
+        indexes = sorted(map(self.word_indexes.__getitem__,
+                             self.suffixes[start:end]))
+        return [self.words[index] for index in indexes]
+
+    def complete_batch(self, prefixes):
+        """Return a list of the lists of strings that start with each of the
+        given prefixes, in the same order as the prefixes. Only prefixes that
+        don't extend an earlier prefix search the suffixes; the rest are
+        sliced from the sorted completions of the prefix they extend."""
+        return complete_batch(prefixes, self.complete)
+
+    def strings(self):
+        """Return a list of all strings in this suffix array."""
+        return list(self.words)
+
+
+def build_suffix_array(text):
+    """Return an array of the starting positions of all suffixes of the given
+    text in sorted order of the suffixes, built by prefix doubling: suffixes
+    are sorted by their first k characters, and each round ranks them by
+    their first 2k characters using the ranks of their two halves.
+    Running time: O(n*log^2 n), with fewer rounds when no long substrings
+    repeat, since sorting stops once every suffix has a different rank"""
+    length = len(text)
+    suffixes = list(range(length))
+    # Rank each suffix by its first character, numbering the distinct
+    # characters from 0 so every rank is less than the length of the text
+    alphabet = {char: rank for rank, char in enumerate(sorted(set(text)))}
+    ranks = [alphabet[char] for char in text]
+    span = 1
+    while length > 1:
+        # Rank suffixes by the ranks of their first and second halves, where
+        # a missing second half (past the end of the text) ranks first
+        keys = [ranks[index] * (length + 1) +
+                (ranks[index + span] + 1 if index + span < length else 0)
+                for index in range(length)]
+        suffixes.sort(key=keys.__getitem__)
+        # Give suffixes with equal keys equal ranks
+        rank = 0
+        ranks[suffixes[0]] = 0
+        for previous, index in zip(suffixes, suffixes[1:]):
+            if keys[index] != keys[previous]:
+                rank += 1
+            ranks[index] = rank
+        if rank == length - 1:
+            break
+        span *= 2
+    return array('i', suffixes)
+
+
+def build_lcp_array(text, suffixes):
+    """Return an array of the length of the longest common prefix of each
+    suffix in the given suffix array and the suffix before it (0 for the
+    first), built with Kasai's algorithm: visiting suffixes in text order,
+    each one's LCP is at least one less than the previous one's.
+    Running time: O(n)"""
+    length = len(text)
+    lcp = array('i', [0]) * length
+    rank = array('i', [0]) * length
+    for index, start in enumerate(suffixes):
+        rank[start] = index
+    common = 0
+    for start in range(length):
+        if rank[start] == 0:
+            common = 0
+            continue
+        other = suffixes[rank[start] - 1]
+        while (start + common < length and other + common < length and
+               text[start + common] == text[other + common]):
+            common += 1
+        lcp[rank[start]] = common
+        if common > 0:
+            common -= 1
+    return lcp
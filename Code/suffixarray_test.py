@@ -0,0 +1,62 @@
+#!python3
+
+from suffixarray import SuffixArray, build_suffix_array, build_lcp_array
+import unittest
+
+
+WORDS = ['axle', 'axled', 'axlesmith', 'axletree', 'axe', 'ax', 'banana',
+         'band', 'bandana', 'can', 'cane', 'Axe', 'band']
+FRAGMENTS = ['', 'a', 'an', 'ana', 'xle', 'e', 'Ax', 'cane', 'anes', 'z']
+
+
+class SuffixArrayTest(unittest.TestCase):
+
+    def test_build_suffix_array(self):
+        for text in ['banana', 'mississippi', 'aaaaaa', 'ab\nab\nab', 'a', '']:
+            suffixes = build_suffix_array(text)
+            assert list(suffixes) == sorted(range(len(text)),
+                                            key=lambda index: text[index:])
+
+    def test_build_lcp_array(self):
+        text = 'banana'
+        suffixes = build_suffix_array(text)
+        # Sorted suffixes: a, ana, anana, banana, na, nana
+        assert list(suffixes) == [5, 3, 1, 0, 4, 2]
+        assert list(build_lcp_array(text, suffixes)) == [0, 1, 3, 0, 0, 2]
+
+    def test_init_and_size(self):
+        suffix_array = SuffixArray(WORDS)
+        assert suffix_array.size == 12
+        assert suffix_array.is_empty() is False
+        assert suffix_array.strings() == sorted(set(WORDS))
+        assert suffix_array.contains('band') is True
+        assert suffix_array.contains('ban') is False
+        assert suffix_array.nbytes() > 0
+        assert SuffixArray().is_empty() is True
+        assert SuffixArray().search('a') == []
+
+    def test_search(self):
+        suffix_array = SuffixArray(WORDS)
+        for fragment in FRAGMENTS:
+            expected = sorted(set(word for word in WORDS if fragment in word))
+            assert suffix_array.search(fragment) == expected
+            # Verify a limit returns that many of the matching strings
+            limited = suffix_array.search(fragment, limit=2)
+            assert len(limited) == min(2, len(expected))
+            assert set(limited) <= set(expected)
+        assert suffix_array.search('a\nb') == []
+
+    def test_complete_and_count(self):
+        suffix_array = SuffixArray(WORDS)
+        for prefix in FRAGMENTS:
+            expected = sorted(set(word for word in WORDS
+                                  if word.startswith(prefix)))
+            assert suffix_array.complete(prefix) == expected
+            assert suffix_array.count(prefix) == len(expected)
+        prefixes = ['ax', 'b', 'ax', 'axl', 'ba']
+        assert suffix_array.complete_batch(prefixes) == \
+            [suffix_array.complete(prefix) for prefix in prefixes]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!python3
+
+from itertools import accumulate
+import random
+import sys
+
+
+def random_words(count=200000, min_length=3, max_length=12, seed=0):
+    """Return a sorted list of `count` unique words with lengths sampled from
+    range [`min_length`...`max_length`], generated deterministically from the
+    given seed. Letters are weighted roughly like English text so that many
+    words share prefixes, as they do in a real dictionary. Raise ValueError if
+    there are fewer than `count` possible words of those lengths."""
+    letters = 'etaoinshrdlcumwfgypbvkjxqz'
+    num_possible = sum(len(letters) ** length
+                       for length in range(min_length, max_length + 1))
+    if count > num_possible:
+        raise ValueError(f'Only {num_possible} words have lengths '
+                         f'{min_length} to {max_length}, fewer than {count}')
+    rng = random.Random(seed)
+    cum_weights = list(accumulate(len(letters) - i
+                                  for i in range(len(letters))))
+    words = set()
+    while len(words) < count:
+        length = rng.randint(min_length, max_length)
+        words.add(''.join(rng.choices(letters, cum_weights=cum_weights,
+                                      k=length)))
+    return sorted(words)
+
+
+def zipf_prefixes(vocabulary, count=10000, max_length=4, exponent=1.1,
+                  seed=0):
+    """Return a list of `count` prefixes of words in the given vocabulary with
+    lengths in range [1...`max_length`], sampled deterministically from the
+    given seed. Distinct prefixes are ranked by how many words start with
+    them, and the prefix of rank r is sampled with probability proportional
+    to 1 / r**exponent (a Zipf distribution), so short, common prefixes are
+    requested far more often than long, rare ones, as in real traffic."""
+    # Count how many words start with each prefix
+    word_counts = {}
+    for word in vocabulary:
+        for length in range(1, min(len(word), max_length) + 1):
+            prefix = word[:length]
+            word_counts[prefix] = word_counts.get(prefix, 0) + 1
+    if len(word_counts) == 0:
+        return []
+    # Rank prefixes by decreasing word count, breaking ties alphabetically
+    ranked = sorted(word_counts, key=lambda prefix: (-word_counts[prefix],
+                                                     prefix))
+    cum_weights = list(accumulate(1 / rank ** exponent
+                                  for rank in range(1, len(ranked) + 1)))
+    rng = random.Random(seed)
+    return rng.choices(ranked, cum_weights=cum_weights, k=count)
+
+
+def write_lines(filename, lines):
+    """Write the given strings to the given text file, one per line."""
+    with open(filename, 'w') as file:
+        for line in lines:
+            file.write(line)
+            file.write('\n')
+
+
+def main():
+    """Read command-line arguments and write a synthetic vocabulary file and a
+    Zipf-distributed prefixes file."""
+    args = sys.argv[1:]  # Ignore script file name
+    if len(args) < 2:
+        script = sys.argv[0]  # Get script file name
+        print('Usage: {} vocabulary-file prefixes-file [words] [queries] '
+              '[seed]'.format(script))
+        print('Write `words` random words and `queries` prefixes of them')
+        print('\nExample: {} words.txt prefixes.txt 1000000 100000'
+              .format(script))
+        return
+    try:
+        num_words = int(args[2]) if len(args) >= 3 else 200000
+        num_queries = int(args[3]) if len(args) >= 4 else 10000
+        seed = int(args[4]) if len(args) >= 5 else 0
+    except ValueError:
+        print('Integer required for `words`, `queries` and `seed` arguments')
+        return
+    vocabulary = random_words(num_words, seed=seed)
+    write_lines(args[0], vocabulary)
+    write_lines(args[1], zipf_prefixes(vocabulary, num_queries, seed=seed))
+
+
+if __name__ == '__main__':
+    main()
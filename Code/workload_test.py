@@ -0,0 +1,35 @@
+#!python3
+
+from workload import random_words, zipf_prefixes
+import unittest
+
+
+class WorkloadTest(unittest.TestCase):
+
+    def test_random_words_are_deterministic(self):
+        words = random_words(500, seed=1)
+        assert len(words) == 500
+        assert words == sorted(set(words))
+        assert random_words(500, seed=1) == words
+        assert random_words(500, seed=2) != words
+        # Verify every possible word can be generated, but no more
+        assert len(random_words(26 + 26 ** 2, 1, 2)) == 26 + 26 ** 2
+        with self.assertRaises(ValueError):
+            random_words(26 + 26 ** 2 + 1, 1, 2)
+
+    def test_zipf_prefixes(self):
+        words = random_words(500, seed=1)
+        prefixes = zipf_prefixes(words, 2000, max_length=3, seed=1)
+        assert len(prefixes) == 2000
+        assert zipf_prefixes(words, 2000, max_length=3, seed=1) == prefixes
+        assert all(1 <= len(prefix) <= 3 for prefix in prefixes)
+        assert all(any(word.startswith(prefix) for word in words)
+                   for prefix in set(prefixes))
+        # Verify the most common prefix is requested the most often
+        most_common = max(set(prefixes), key=prefixes.count)
+        assert len(most_common) == 1
+        assert zipf_prefixes([], 10) == []
+
+
+if __name__ == '__main__':
+    unittest.main()